@@ -11,10 +11,10 @@
 
 import sys
 from ctypes.util import find_library
+from functools import lru_cache
 from pathlib import Path
 
 from . import constants
-from ._generated.ffi import ffi
 
 VERSION = __version__ = (Path(__file__).parent / 'VERSION').read_text().strip()
 # supported version of cairo, used to be pycairo version too:
@@ -45,9 +45,15 @@ def dlopen(ffi, library_names, filenames):
     raise OSError(error_message)  # pragma: no cover
 
 
-cairo = dlopen(
-    ffi, ('cairo-2', 'cairo', 'libcairo-2'),
-    ('libcairo.so.2', 'libcairo.2.dylib', 'libcairo-2.dll'))
+try:
+    # Compiled API-mode bindings, only built with CAIROCFFI_API_MODE=1
+    from ._generated._cairo import ffi
+    from ._generated._cairo import lib as cairo
+except ImportError:
+    from ._generated.ffi import ffi
+    cairo = dlopen(
+        ffi, ('cairo-2', 'cairo', 'libcairo-2'),
+        ('libcairo.so.2', 'libcairo.2.dylib', 'libcairo-2.dll'))
 
 
 class _keepref(object):
@@ -88,6 +94,7 @@ def _check_status(status):
         raise exception(message, status)
 
 
+@lru_cache(maxsize=1)
 def cairo_version():
     """Return the cairo version number as a single integer,
     such as 11208 for ``1.12.8``.
@@ -98,10 +105,14 @@ def cairo_version():
         if cairo_version() >= 11000:
             surface.set_mime_data('image/jpeg', jpeg_bytes)
 
+    The version of the loaded library can not change,
+    it is only queried once.
+
     """
     return cairo.cairo_version()
 
 
+@lru_cache(maxsize=1)
 def cairo_version_string():
     """Return the cairo version number as a string, such as ``1.12.8``."""
     return ffi.string(cairo.cairo_version_string()).decode('ascii')
@@ -130,7 +141,7 @@ from .patterns import (  # noqa isort:skip
     RadialGradient)
 from .fonts import (  # noqa isort:skip
     FontFace, ToyFontFace, ScaledFont, FontOptions)
-from .context import Context  # noqa isort:skip
+from .context import Context, PathData  # noqa isort:skip
 from .matrix import Matrix  # noqa isort:skip
 
 from .constants import *  # noqa isort:skip
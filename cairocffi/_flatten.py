@@ -0,0 +1,322 @@
+"""
+    cairocffi._flatten
+    ~~~~~~~~~~~~~~~~~~
+
+    Flattening of cubic Bézier curves into polylines.
+
+    Curves are split at their inflection points and approximated by
+    quadratic Béziers, whose subdivision is computed with the analytic
+    method described by Raph Levien in
+    https://raphlinus.github.io/graphics/curves/2019/12/23/flatten-quadbez.html
+    and implemented in the kurbo library.
+
+    This method only estimates the error. The line segments are checked
+    against a bound of their actual distance to the cubic curve, and split
+    when they are too far from it.
+
+    :copyright: Copyright 2013-2019 by Simon Sapin
+    :license: BSD, see LICENSE for details.
+
+"""
+
+from math import ceil, hypot, sqrt
+
+# Part of the tolerance used to approximate cubics by quadratics
+TO_QUAD_TOLERANCE = 0.1
+# Part of the tolerance targeted by the estimated subdivision, leaving
+# a margin so that the segments rarely have to be split afterwards
+FLATTEN_TOLERANCE = 0.9
+
+
+def _approx_parabola_integral(x):
+    """Approximate the integral of the parabola arc length."""
+    d = 0.67
+    return x / (1 - d + sqrt(sqrt(d ** 4 + 0.25 * x * x)))
+
+
+def _approx_parabola_inv_integral(x):
+    """Approximate the inverse of :func:`_approx_parabola_integral`."""
+    b = 0.39
+    return x * (1 - b + sqrt(b * b + 0.25 * x * x))
+
+
+def _cubic_point(p0, p1, p2, p3, t):
+    """Return the point of a cubic curve at parameter t."""
+    mt = 1 - t
+    a, b, c, d = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+    return (
+        a * p0[0] + b * p1[0] + c * p2[0] + d * p3[0],
+        a * p0[1] + b * p1[1] + c * p2[1] + d * p3[1])
+
+
+def _cubic_derivative(p0, p1, p2, p3, t):
+    """Return the derivative of a cubic curve at parameter t."""
+    mt = 1 - t
+    a, b, c = 3 * mt * mt, 6 * mt * t, 3 * t * t
+    return (
+        a * (p1[0] - p0[0]) + b * (p2[0] - p1[0]) + c * (p3[0] - p2[0]),
+        a * (p1[1] - p0[1]) + b * (p2[1] - p1[1]) + c * (p3[1] - p2[1]))
+
+
+def _subsegment(curve, t0, t1):
+    """Return the control points of a cubic curve between t0 and t1."""
+    start = curve[0] if t0 == 0 else _cubic_point(*curve, t0)
+    end = curve[3] if t1 == 1 else _cubic_point(*curve, t1)
+    (dx0, dy0), (dx1, dy1) = (
+        _cubic_derivative(*curve, t0), _cubic_derivative(*curve, t1))
+    scale = (t1 - t0) / 3
+    return (
+        start, (start[0] + dx0 * scale, start[1] + dy0 * scale),
+        (end[0] - dx1 * scale, end[1] - dy1 * scale), end)
+
+
+def _inflections(p0, p1, p2, p3):
+    """Return the sorted parameters of the inflection points in ``]0, 1[``.
+
+    They are the roots of the cross product of the first and second
+    derivatives, a quadratic polynomial.
+
+    """
+    ax, ay = p1[0] - p0[0], p1[1] - p0[1]
+    bx, by = p2[0] - 2 * p1[0] + p0[0], p2[1] - 2 * p1[1] + p0[1]
+    cx = p3[0] - 3 * p2[0] + 3 * p1[0] - p0[0]
+    cy = p3[1] - 3 * p2[1] + 3 * p1[1] - p0[1]
+    a = bx * cy - by * cx
+    b = ax * cy - ay * cx
+    c = ax * by - ay * bx
+    if a == 0:
+        roots = [] if b == 0 else [-c / b]
+    else:
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            roots = []
+        else:
+            root = sqrt(discriminant)
+            roots = [(-b - root) / (2 * a), (-b + root) / (2 * a)]
+    return sorted(t for t in roots if 0 < t < 1)
+
+
+def _cubic_to_quads(p0, p1, p2, p3, tolerance):
+    """Return quadratic curves approximating a cubic curve.
+
+    The cubic curve is split into parts of equal parameter ranges,
+    each approximated by a ``(q0, q1, q2)`` quadratic curve.
+
+    """
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = p0, p1, p2, p3
+    # 432 is the square of 36 / sqrt(3), see
+    # http://caffeineowl.com/graphics/2d/vectorial/cubic2quad01.html
+    error = hypot(3 * (x2 - x1) - x3 + x0, 3 * (y2 - y1) - y3 + y0) ** 2
+    count = max(1, ceil((error / (432 * tolerance * tolerance)) ** (1 / 6)))
+    quads = []
+    for i in range(count):
+        c0, c1, c2, c3 = _subsegment(
+            (p0, p1, p2, p3), i / count, (i + 1) / count)
+        quads.append((c0, (
+            (3 * (c1[0] + c2[0]) - c0[0] - c3[0]) / 4,
+            (3 * (c1[1] + c2[1]) - c0[1] - c3[1]) / 4,
+        ), c3))
+    return quads
+
+
+def _quad_parameters(q0, q1, q2, sqrt_tolerance):
+    """Return parameters mapping a quadratic curve to the ``y = x²`` parabola.
+
+    The returned tuple ends with a value proportional to the number of
+    segments needed, and with whether the curve includes the vertex of
+    the parabola.
+    :obj:`None` is returned for quadratic curves whose points are collinear.
+
+    """
+    (x0, y0), (x1, y1), (x2, y2) = q0, q1, q2
+    ddx, ddy = 2 * x1 - x0 - x2, 2 * y1 - y0 - y2
+    cross = (x2 - x0) * ddy - (y2 - y0) * ddx
+    if cross == 0:
+        return None
+    start = ((x1 - x0) * ddx + (y1 - y0) * ddy) / cross
+    end = ((x2 - x1) * ddx + (y2 - y1) * ddy) / cross
+    scale = abs(cross / (hypot(ddx, ddy) * (end - start)))
+    a0 = _approx_parabola_integral(start)
+    a2 = _approx_parabola_integral(end)
+    sqrt_scale = sqrt(scale)
+    cusp = (start < 0) != (end < 0)
+    if not cusp:
+        value = abs(a2 - a0) * sqrt_scale
+    else:
+        # Cusp, the segment contains the curvature maximum
+        value = (
+            sqrt_tolerance * abs(a2 - a0) /
+            _approx_parabola_integral(sqrt_tolerance / sqrt_scale))
+    u0 = _approx_parabola_inv_integral(a0)
+    u2 = _approx_parabola_inv_integral(a2)
+    return a0, a2, u0, 1 / (u2 - u0), value, cusp
+
+
+def _collinear_extremum(q0, q1, q2):
+    """Return the parameter where a collinear quadratic curve turns back.
+
+    :obj:`None` is returned when the curve goes straight from q0 to q2.
+
+    """
+    ddx, ddy = q0[0] - 2 * q1[0] + q2[0], q0[1] - 2 * q1[1] + q2[1]
+    square_length = ddx * ddx + ddy * ddy
+    if square_length == 0:
+        return None
+    t = ((q0[0] - q1[0]) * ddx + (q0[1] - q1[1]) * ddy) / square_length
+    if 0 < t < 1:
+        return t
+
+
+def _subdivide_quads(quads, sqrt_tolerance, parameters):
+    """Append the parameters where quadratic curves are subdivided.
+
+    :obj:`quads` is a list of ``(index, parameters)`` tuples, where
+    parameters are given by :func:`_quad_parameters` and where the curve
+    with a given index covers the ``[index, index + 1]`` parameter range.
+    The subdivision is spread over all the curves, which is only correct
+    when they bend the same way without including the vertex of their
+    parabola.
+
+    """
+    total = sum(quad_parameters[4] for _, quad_parameters in quads)
+    count = max(1, ceil(0.5 * total / sqrt_tolerance))
+    step = total / count
+    i = 1
+    value_sum = 0
+    for index, (a0, a2, u0, u_scale, value, _) in quads:
+        target = i * step
+        while i < count and target < value_sum + value:
+            u = _approx_parabola_inv_integral(
+                a0 + (a2 - a0) * (target - value_sum) / value)
+            parameters.append(index + (u - u0) * u_scale)
+            i += 1
+            target = i * step
+        value_sum += value
+    parameters.append(quads[-1][0] + 1)
+
+
+def _estimate_parameters(p0, p1, p2, p3, tolerance):
+    """Return the parameters where a cubic curve should be subdivided.
+
+    The curve must have no inflection point, so that its quadratic
+    approximations all bend the same way. The returned list excludes 0
+    and includes 1.
+
+    """
+    sqrt_tolerance = sqrt(tolerance * FLATTEN_TOLERANCE)
+    quads = _cubic_to_quads(p0, p1, p2, p3, tolerance * TO_QUAD_TOLERANCE)
+    parameters = []
+    group = []
+    for index, quad in enumerate(quads):
+        quad_parameters = _quad_parameters(*quad, sqrt_tolerance)
+        if quad_parameters is not None and not quad_parameters[5]:
+            group.append((index, quad_parameters))
+            continue
+        # Curves including a cusp and collinear curves are subdivided on
+        # their own, as their parameters are not comparable to others
+        if group:
+            _subdivide_quads(group, sqrt_tolerance, parameters)
+            group = []
+        if quad_parameters is None:
+            extremum = _collinear_extremum(*quad)
+            if extremum is not None:
+                parameters.append(index + extremum)
+            parameters.append(index + 1)
+        else:
+            _subdivide_quads(
+                [(index, quad_parameters)], sqrt_tolerance, parameters)
+    if group:
+        _subdivide_quads(group, sqrt_tolerance, parameters)
+    return [parameter / len(quads) for parameter in parameters]
+
+
+def _segment_error(c0, c1, c2, c3):
+    """Return a bound of the distance between a cubic curve and its chord.
+
+    When the control points project on the chord, so does the curve, and
+    the distance is its distance to the line. Otherwise, the distance is
+    bounded by the distance between the curve and the point of the chord
+    with the same parameter. In both cases, the bound is 3/4 of the
+    distance of the control points to the line or to the thirds of the
+    chord.
+
+    """
+    dx, dy = c3[0] - c0[0], c3[1] - c0[1]
+    square_length = dx * dx + dy * dy
+    if square_length:
+        projections = [
+            ((x - c0[0]) * dx + (y - c0[1]) * dy) / square_length
+            for x, y in (c1, c2)]
+        if all(0 <= projection <= 1 for projection in projections):
+            return 0.75 * max(
+                abs((x - c0[0]) * dy - (y - c0[1]) * dx)
+                for x, y in (c1, c2)) / sqrt(square_length)
+    return 0.75 * max(
+        hypot(c1[0] - c0[0] - dx / 3, c1[1] - c0[1] - dy / 3),
+        hypot(c2[0] - c3[0] + dx / 3, c2[1] - c3[1] + dy / 3))
+
+
+def _append_segments(curve, t0, t1, tolerance, points):
+    """Append the ends of segments approximating a part of a cubic curve.
+
+    The segment between t0 and t1 is split until it is close enough to
+    the curve.
+
+    """
+    c0, c1, c2, c3 = _subsegment(curve, t0, t1)
+    if _segment_error(c0, c1, c2, c3) > tolerance:
+        middle = (t0 + t1) / 2
+        _append_segments(curve, t0, middle, tolerance, points)
+        _append_segments(curve, middle, t1, tolerance, points)
+    else:
+        points.append(c3)
+
+
+def is_linear(p0, p1, p2, p3, tolerance):
+    """Return whether a cubic Bézier curve can be drawn as a single line.
+
+    This is the case when both control points are within :obj:`tolerance`
+    of the line going through the end points,
+    and project between the end points.
+
+    """
+    (x0, y0), (x3, y3) = p0, p3
+    dx, dy = x3 - x0, y3 - y0
+    square_length = dx * dx + dy * dy
+    if square_length == 0:
+        return False
+    length = sqrt(square_length)
+    for x, y in (p1, p2):
+        if abs((x - x0) * dy - (y - y0) * dx) > tolerance * length:
+            return False
+        if not 0 <= (x - x0) * dx + (y - y0) * dy <= square_length:
+            return False
+    return True
+
+
+def flatten_cubic(p0, p1, p2, p3, tolerance):
+    """Approximate a cubic Bézier curve with line segments.
+
+    :param p0: Start point, as a ``(x, y)`` tuple.
+    :param p1: First control point.
+    :param p2: Second control point.
+    :param p3: End point.
+    :param tolerance: Maximum distance between the curve and the lines.
+    :returns:
+        A list of ``(x, y)`` tuples, the ends of the line segments,
+        excluding :obj:`p0` and including :obj:`p3`.
+
+    """
+    if is_linear(p0, p1, p2, p3, tolerance):
+        return [p3]
+    curve = (p0, p1, p2, p3)
+    bounds = [0] + _inflections(*curve) + [1]
+    points = []
+    previous = 0
+    for start, end in zip(bounds, bounds[1:]):
+        part = _subsegment(curve, start, end)
+        for parameter in _estimate_parameters(*part, tolerance):
+            parameter = start + (end - start) * parameter
+            _append_segments(curve, previous, parameter, tolerance, points)
+            previous = parameter
+    return points
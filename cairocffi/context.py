@@ -9,11 +9,128 @@
 
 """
 
+import struct
+from array import array
+from collections import namedtuple
+
 from . import _check_status, _keepref, cairo, constants, ffi
 from .fonts import FontFace, FontOptions, ScaledFont, _encode_string
 from .matrix import Matrix
 from .patterns import Pattern
-from .surfaces import Surface
+from .surfaces import Surface, _flush_memory_writer
+
+# Bound once at import time to save a lookup on the library for each call.
+# Context, ScaledFont, ImageSurface and Gradient call all their functions
+# through these names, except the ones that may be missing from the
+# library: functions added after cairo 1.8, and PNG functions. Other
+# objects only bind their status check.
+_cairo_append_path = cairo.cairo_append_path
+_cairo_arc = cairo.cairo_arc
+_cairo_arc_negative = cairo.cairo_arc_negative
+_cairo_clip = cairo.cairo_clip
+_cairo_clip_extents = cairo.cairo_clip_extents
+_cairo_clip_preserve = cairo.cairo_clip_preserve
+_cairo_close_path = cairo.cairo_close_path
+_cairo_copy_clip_rectangle_list = cairo.cairo_copy_clip_rectangle_list
+_cairo_copy_page = cairo.cairo_copy_page
+_cairo_copy_path = cairo.cairo_copy_path
+_cairo_copy_path_flat = cairo.cairo_copy_path_flat
+_cairo_create = cairo.cairo_create
+_cairo_curve_to = cairo.cairo_curve_to
+_cairo_destroy = cairo.cairo_destroy
+_cairo_device_to_user = cairo.cairo_device_to_user
+_cairo_device_to_user_distance = cairo.cairo_device_to_user_distance
+_cairo_fill = cairo.cairo_fill
+_cairo_fill_extents = cairo.cairo_fill_extents
+_cairo_fill_preserve = cairo.cairo_fill_preserve
+_cairo_font_extents = cairo.cairo_font_extents
+_cairo_get_antialias = cairo.cairo_get_antialias
+_cairo_get_current_point = cairo.cairo_get_current_point
+_cairo_get_dash = cairo.cairo_get_dash
+_cairo_get_dash_count = cairo.cairo_get_dash_count
+_cairo_get_fill_rule = cairo.cairo_get_fill_rule
+_cairo_get_font_face = cairo.cairo_get_font_face
+_cairo_get_font_matrix = cairo.cairo_get_font_matrix
+_cairo_get_font_options = cairo.cairo_get_font_options
+_cairo_get_group_target = cairo.cairo_get_group_target
+_cairo_get_line_cap = cairo.cairo_get_line_cap
+_cairo_get_line_join = cairo.cairo_get_line_join
+_cairo_get_line_width = cairo.cairo_get_line_width
+_cairo_get_matrix = cairo.cairo_get_matrix
+_cairo_get_miter_limit = cairo.cairo_get_miter_limit
+_cairo_get_operator = cairo.cairo_get_operator
+_cairo_get_scaled_font = cairo.cairo_get_scaled_font
+_cairo_get_source = cairo.cairo_get_source
+_cairo_get_target = cairo.cairo_get_target
+_cairo_get_tolerance = cairo.cairo_get_tolerance
+_cairo_glyph_extents = cairo.cairo_glyph_extents
+_cairo_glyph_path = cairo.cairo_glyph_path
+_cairo_has_current_point = cairo.cairo_has_current_point
+_cairo_identity_matrix = cairo.cairo_identity_matrix
+_cairo_in_fill = cairo.cairo_in_fill
+_cairo_in_stroke = cairo.cairo_in_stroke
+_cairo_line_to = cairo.cairo_line_to
+_cairo_mask = cairo.cairo_mask
+_cairo_mask_surface = cairo.cairo_mask_surface
+_cairo_move_to = cairo.cairo_move_to
+_cairo_new_path = cairo.cairo_new_path
+_cairo_new_sub_path = cairo.cairo_new_sub_path
+_cairo_paint = cairo.cairo_paint
+_cairo_paint_with_alpha = cairo.cairo_paint_with_alpha
+_cairo_path_destroy = cairo.cairo_path_destroy
+_cairo_path_extents = cairo.cairo_path_extents
+_cairo_pop_group = cairo.cairo_pop_group
+_cairo_pop_group_to_source = cairo.cairo_pop_group_to_source
+_cairo_push_group = cairo.cairo_push_group
+_cairo_push_group_with_content = cairo.cairo_push_group_with_content
+_cairo_rectangle = cairo.cairo_rectangle
+_cairo_rectangle_list_destroy = cairo.cairo_rectangle_list_destroy
+_cairo_reference = cairo.cairo_reference
+_cairo_rel_curve_to = cairo.cairo_rel_curve_to
+_cairo_rel_line_to = cairo.cairo_rel_line_to
+_cairo_rel_move_to = cairo.cairo_rel_move_to
+_cairo_reset_clip = cairo.cairo_reset_clip
+_cairo_restore = cairo.cairo_restore
+_cairo_rotate = cairo.cairo_rotate
+_cairo_save = cairo.cairo_save
+_cairo_scale = cairo.cairo_scale
+_cairo_select_font_face = cairo.cairo_select_font_face
+_cairo_set_antialias = cairo.cairo_set_antialias
+_cairo_set_dash = cairo.cairo_set_dash
+_cairo_set_fill_rule = cairo.cairo_set_fill_rule
+_cairo_set_font_face = cairo.cairo_set_font_face
+_cairo_set_font_matrix = cairo.cairo_set_font_matrix
+_cairo_set_font_options = cairo.cairo_set_font_options
+_cairo_set_font_size = cairo.cairo_set_font_size
+_cairo_set_line_cap = cairo.cairo_set_line_cap
+_cairo_set_line_join = cairo.cairo_set_line_join
+_cairo_set_line_width = cairo.cairo_set_line_width
+_cairo_set_matrix = cairo.cairo_set_matrix
+_cairo_set_miter_limit = cairo.cairo_set_miter_limit
+_cairo_set_operator = cairo.cairo_set_operator
+_cairo_set_scaled_font = cairo.cairo_set_scaled_font
+_cairo_set_source = cairo.cairo_set_source
+_cairo_set_source_rgb = cairo.cairo_set_source_rgb
+_cairo_set_source_rgba = cairo.cairo_set_source_rgba
+_cairo_set_source_surface = cairo.cairo_set_source_surface
+_cairo_set_tolerance = cairo.cairo_set_tolerance
+_cairo_show_glyphs = cairo.cairo_show_glyphs
+_cairo_show_page = cairo.cairo_show_page
+_cairo_show_text = cairo.cairo_show_text
+_cairo_show_text_glyphs = cairo.cairo_show_text_glyphs
+_cairo_status = cairo.cairo_status
+_cairo_stroke = cairo.cairo_stroke
+_cairo_stroke_extents = cairo.cairo_stroke_extents
+_cairo_stroke_preserve = cairo.cairo_stroke_preserve
+_cairo_text_extents = cairo.cairo_text_extents
+_cairo_text_path = cairo.cairo_text_path
+_cairo_transform = cairo.cairo_transform
+_cairo_translate = cairo.cairo_translate
+_cairo_user_to_device = cairo.cairo_user_to_device
+_cairo_user_to_device_distance = cairo.cairo_user_to_device_distance
+
+# Longest dash pattern stored in the context scratch buffer
+_DASH_BUFFER_SIZE = 64
 
 PATH_POINTS_PER_TYPE = {
     constants.PATH_MOVE_TO: 1,
@@ -22,44 +139,150 @@ PATH_POINTS_PER_TYPE = {
     constants.PATH_CLOSE_PATH: 0
 }
 
+# Native layouts of cairo_path_data_t items, as used by struct:
+# headers are two ints padded to the size of the union,
+# points are two doubles.
+_PATH_DATA_SIZE = ffi.sizeof('cairo_path_data_t')
+_PATH_HEADER_FORMAT = 'ii%dx' % (_PATH_DATA_SIZE - 2 * ffi.sizeof('int'))
+
+# Size of cairo_rectangle_t, four doubles
+_RECTANGLE_SIZE = ffi.sizeof('cairo_rectangle_t')
+
+
+class PathData(namedtuple('PathData', 'types points')):
+    """A path stored in two flat arrays,
+    as returned by :meth:`Context.copy_path_array`.
+
+    .. attribute:: types
+
+        A :class:`bytes` object of :ref:`PATH_OPERATION` values,
+        one for each portion of the path.
+
+    .. attribute:: points
+
+        An :class:`array.array` of ``'d'`` floats,
+        the ``x, y`` coordinates of all the points of the path.
+        See :meth:`Context.copy_path` for the number of points
+        of each path operation.
+
+    Both objects support the buffer protocol,
+    for example with :func:`numpy.frombuffer`.
+    A :class:`PathData` can be given to :meth:`Context.append_path`,
+    with any sequence of path operations as :obj:`types`
+    and any buffer of doubles as :obj:`points`.
+
+    *New in cairocffi 1.5.*
+
+    """
+    __slots__ = ()
+
 
 def _encode_path(path_items):
     """Take an iterable of ``(path_operation, coordinates)`` tuples
-    in the same format as from :meth:`Context.copy_path`
+    in the same format as from :meth:`Context.copy_path`,
+    or a :class:`PathData` tuple,
     and return a ``(path, data)`` tuple of cdata object.
 
     The first cdata object is a ``cairo_path_t *`` pointer
     that can be used as long as both objects live.
 
     """
+    if isinstance(path_items, PathData):
+        return _encode_path_data(*path_items)
+
     points_per_type = PATH_POINTS_PER_TYPE
-    path_items = list(path_items)
-    length = 0
+    header_format = _PATH_HEADER_FORMAT
+    formats = []
+    values = []
     for path_type, coordinates in path_items:
         num_points = points_per_type[path_type]
-        length += 1 + num_points  # 1 header + N points
         if len(coordinates) != 2 * num_points:
             raise ValueError('Expected %d coordinates, got %d.' % (
                 2 * num_points, len(coordinates)))
+        formats.append(header_format + 'dd' * num_points)
+        values += (path_type, 1 + num_points)  # 1 header + N points
+        values += coordinates
+
+    # Pack the whole path at once and copy it with a single memmove,
+    # instead of setting each header and point field through cffi.
+    try:
+        packed = struct.pack(''.join(formats), *values)
+    except struct.error as exception:
+        raise TypeError(exception)
+    return _encode_packed_path(packed)
+
+
+def _encode_path_data(types, points):
+    """Like :func:`_encode_path`, for the attributes of :class:`PathData`."""
+    points = memoryview(points)
+    if points.format != 'd':
+        raise TypeError(
+            'Expected a buffer of doubles, got format %r.' % points.format)
+    points = points.cast('B')
+    points_per_type = PATH_POINTS_PER_TYPE
+    header_format = _PATH_HEADER_FORMAT
+    chunks = []
+    position = 0
+    for path_type in types:
+        num_points = points_per_type[path_type]
+        end = position + num_points * _PATH_DATA_SIZE
+        chunks.append(struct.pack(header_format, path_type, 1 + num_points))
+        chunks.append(points[position:end])
+        position = end
+    if position != len(points):
+        raise ValueError('Expected %d coordinates, got %d.' % (
+            position // ffi.sizeof('double'),
+            len(points) // ffi.sizeof('double')))
+    return _encode_packed_path(b''.join(chunks))
+
+
+def _encode_packed_path(packed):
+    """Take packed cairo_path_data_t items
+    and return a ``(path, data)`` tuple of cdata object.
 
+    """
+    length = len(packed) // _PATH_DATA_SIZE
     data = ffi.new('cairo_path_data_t[]', length)
-    position = 0
-    for path_type, coordinates in path_items:
-        header = data[position].header
-        header.type = path_type
-        header.length = 1 + len(coordinates) // 2
-        position += 1
-        for i in range(0, len(coordinates), 2):
-            point = data[position].point
-            point.x = coordinates[i]
-            point.y = coordinates[i + 1]
-            position += 1
+    ffi.memmove(data, packed, len(packed))
     path = ffi.new(
         'cairo_path_t *',
         {'status': constants.STATUS_SUCCESS, 'data': data, 'num_data': length})
     return path, data
 
 
+def _path_data(pointer, with_points=True):
+    """Take a cairo_path_t * pointer and return a :class:`PathData` tuple.
+
+    When :obj:`with_points` is false, points are skipped
+    and the ``points`` array is left empty.
+
+    """
+    _check_status(pointer.status)
+    types = bytearray()
+    points = array('d')
+    num_data = pointer.num_data
+    if num_data:
+        # Read all the headers at once, and copy the points in blocks,
+        # instead of reading each field through cffi.
+        data = memoryview(
+            ffi.buffer(pointer.data, num_data * _PATH_DATA_SIZE))
+        ints = data.cast('i')
+        ints_per_data = _PATH_DATA_SIZE // ffi.sizeof('int')
+        headers = ints[::ints_per_data].tolist()
+        lengths = ints[1::ints_per_data].tolist()
+        points_per_type = PATH_POINTS_PER_TYPE
+        position = 0
+        while position < num_data:
+            path_type = headers[position]
+            types.append(path_type)
+            if with_points:
+                start = (position + 1) * _PATH_DATA_SIZE
+                end = start + points_per_type[path_type] * _PATH_DATA_SIZE
+                points.frombytes(data[start:end])
+            position += lengths[position]
+    return PathData(bytes(types), points)
+
+
 def _iter_path(pointer):
     """Take a cairo_path_t * pointer
     and yield ``(path_operation, coordinates)`` tuples.
@@ -67,20 +290,14 @@ def _iter_path(pointer):
     See :meth:`Context.copy_path` for the data structure.
 
     """
-    _check_status(pointer.status)
-    data = pointer.data
-    num_data = pointer.num_data
+    types, points = _path_data(pointer)
+    coordinates = points.tolist()
     points_per_type = PATH_POINTS_PER_TYPE
     position = 0
-    while position < num_data:
-        path_data = data[position]
-        path_type = path_data.header.type
-        points = ()
-        for i in range(points_per_type[path_type]):
-            point = data[position + i + 1].point
-            points += (point.x, point.y)
-        yield (path_type, points)
-        position += path_data.header.length
+    for path_type in types:
+        end = position + 2 * points_per_type[path_type]
+        yield (path_type, tuple(coordinates[position:end]))
+        position = end
 
 
 class Context(object):
@@ -96,15 +313,31 @@ class Context(object):
     See :meth:`save`.
 
     """
+    _dashes = None
+
     def __init__(self, target):
-        self._init_pointer(cairo.cairo_create(target._pointer))
+        self._init_pointer(_cairo_create(target._pointer))
 
     def _init_pointer(self, pointer):
-        self._pointer = ffi.gc(pointer, _keepref(cairo, cairo.cairo_destroy))
+        self._pointer = ffi.gc(pointer, _keepref(cairo, _cairo_destroy))
+        # Scratch space for the double * output parameters of getters,
+        # reused instead of allocating new arrays on each call.
+        # Like the cairo_t itself, this is not safe to share between threads.
+        self._doubles = doubles = ffi.new('double[4]')
+        self._double_pointers = (
+            doubles + 0, doubles + 1, doubles + 2, doubles + 3)
         self._check_status()
 
     def _check_status(self):
-        _check_status(cairo.cairo_status(self._pointer))
+        _check_status(_cairo_status(self._pointer))
+
+    def _dash_buffer(self, count):
+        # Scratch space for dash patterns, allocated on first use
+        if count > _DASH_BUFFER_SIZE:
+            return ffi.new('double[]', count)
+        if self._dashes is None:
+            self._dashes = ffi.new('double[]', _DASH_BUFFER_SIZE)
+        return self._dashes
 
     @classmethod
     def _from_pointer(cls, pointer, incref):
@@ -120,7 +353,7 @@ class Context(object):
         if pointer == ffi.NULL:
             raise ValueError('Null pointer')
         if incref:
-            cairo.cairo_reference(pointer)
+            _cairo_reference(pointer)
         self = object.__new__(cls)
         cls._init_pointer(self, pointer)
         return self
@@ -134,7 +367,7 @@ class Context(object):
 
         """
         return Surface._from_pointer(
-            cairo.cairo_get_target(self._pointer), incref=True)
+            _cairo_get_target(self._pointer), incref=True)
 
     #
     #  Save / restore
@@ -164,7 +397,7 @@ class Context(object):
                 context.restore()
 
         """
-        cairo.cairo_save(self._pointer)
+        _cairo_save(self._pointer)
         self._check_status()
 
     def restore(self):
@@ -173,7 +406,7 @@ class Context(object):
         and removes that state from the stack of saved states.
 
         """
-        cairo.cairo_restore(self._pointer)
+        _cairo_restore(self._pointer)
         self._check_status()
 
     def __enter__(self):
@@ -229,7 +462,7 @@ class Context(object):
             context.paint_with_alpha(alpha)
 
         """
-        cairo.cairo_push_group(self._pointer)
+        _cairo_push_group(self._pointer)
         self._check_status()
 
     def push_group_with_content(self, content):
@@ -250,7 +483,7 @@ class Context(object):
         :param content: A :ref:`CONTENT` string.
 
         """
-        cairo.cairo_push_group_with_content(self._pointer, content)
+        _cairo_push_group_with_content(self._pointer, content)
         self._check_status()
 
     def pop_group(self):
@@ -271,7 +504,7 @@ class Context(object):
 
         """
         return Pattern._from_pointer(
-            cairo.cairo_pop_group(self._pointer), incref=False)
+            _cairo_pop_group(self._pointer), incref=False)
 
     def pop_group_to_source(self):
         """Terminates the redirection begun by a call to :meth:`push_group`
@@ -284,7 +517,7 @@ class Context(object):
             context.set_source(context.pop_group())
 
         """
-        cairo.cairo_pop_group_to_source(self._pointer)
+        _cairo_pop_group_to_source(self._pointer)
         self._check_status()
 
     def get_group_target(self):
@@ -297,7 +530,7 @@ class Context(object):
 
         """
         return Surface._from_pointer(
-            cairo.cairo_get_group_target(self._pointer), incref=True)
+            _cairo_get_group_target(self._pointer), incref=True)
 
     #
     #  Sources
@@ -327,7 +560,7 @@ class Context(object):
         :type alpha: float
 
         """
-        cairo.cairo_set_source_rgba(self._pointer, red, green, blue, alpha)
+        _cairo_set_source_rgba(self._pointer, red, green, blue, alpha)
         self._check_status()
 
     def set_source_rgb(self, red, green, blue):
@@ -335,7 +568,7 @@ class Context(object):
         Exists for compatibility with pycairo.
 
         """
-        cairo.cairo_set_source_rgb(self._pointer, red, green, blue)
+        _cairo_set_source_rgb(self._pointer, red, green, blue)
         self._check_status()
 
     def set_source_surface(self, surface, x=0, y=0):
@@ -364,7 +597,7 @@ class Context(object):
         :type y: float
 
         """
-        cairo.cairo_set_source_surface(self._pointer, surface._pointer, x, y)
+        _cairo_set_source_surface(self._pointer, surface._pointer, x, y)
         self._check_status()
 
     def set_source(self, source):
@@ -389,7 +622,7 @@ class Context(object):
             as the source for subsequent drawing operations.
 
         """
-        cairo.cairo_set_source(self._pointer, source._pointer)
+        _cairo_set_source(self._pointer, source._pointer)
         self._check_status()
 
     def get_source(self):
@@ -401,7 +634,7 @@ class Context(object):
 
         """
         return Pattern._from_pointer(
-            cairo.cairo_get_source(self._pointer), incref=True)
+            _cairo_get_source(self._pointer), incref=True)
 
     #
     #  Context parameters
@@ -421,12 +654,12 @@ class Context(object):
         :param antialias: An :ref:`ANTIALIAS` string.
 
         """
-        cairo.cairo_set_antialias(self._pointer, antialias)
+        _cairo_set_antialias(self._pointer, antialias)
         self._check_status()
 
     def get_antialias(self):
         """Return the :ref:`ANTIALIAS` string."""
-        return cairo.cairo_get_antialias(self._pointer)
+        return _cairo_get_antialias(self._pointer)
 
     def set_dash(self, dashes, offset=0):
         """Sets the dash pattern to be used by :meth:`stroke`.
@@ -465,8 +698,10 @@ class Context(object):
             The context  will be put into an error state.
 
         """
-        cairo.cairo_set_dash(
-            self._pointer, ffi.new('double[]', dashes), len(dashes), offset)
+        count = len(dashes)
+        buffer = self._dash_buffer(count)
+        buffer[0:count] = dashes
+        _cairo_set_dash(self._pointer, buffer, count, offset)
         self._check_status()
 
     def get_dash(self):
@@ -478,17 +713,18 @@ class Context(object):
             empty if no dashing is in effect.
 
         """
-        dashes = ffi.new('double[]', cairo.cairo_get_dash_count(self._pointer))
-        offset = ffi.new('double *')
-        cairo.cairo_get_dash(self._pointer, dashes, offset)
+        count = _cairo_get_dash_count(self._pointer)
+        dashes = self._dash_buffer(count)
+        offset = self._doubles
+        _cairo_get_dash(self._pointer, dashes, offset)
         self._check_status()
-        return list(dashes), offset[0]
+        return ffi.unpack(dashes, count), offset[0]
 
     def get_dash_count(self):
         """Same as ``len(context.get_dash()[0])``."""
         # Not really useful with get_dash() returning a list,
         # but retained for compatibility with pycairo.
-        return cairo.cairo_get_dash_count(self._pointer)
+        return _cairo_get_dash_count(self._pointer)
 
     def set_fill_rule(self, fill_rule):
         """Set the current :ref:`FILL_RULE` within the cairo context.
@@ -501,12 +737,12 @@ class Context(object):
         :param fill_rule: A :ref:`FILL_RULE` string.
 
         """
-        cairo.cairo_set_fill_rule(self._pointer, fill_rule)
+        _cairo_set_fill_rule(self._pointer, fill_rule)
         self._check_status()
 
     def get_fill_rule(self):
         """Return the current :ref:`FILL_RULE` string."""
-        return cairo.cairo_get_fill_rule(self._pointer)
+        return _cairo_get_fill_rule(self._pointer)
 
     def set_line_cap(self, line_cap):
         """Set the current :ref:`LINE_CAP` within the cairo context.
@@ -520,12 +756,12 @@ class Context(object):
         :param line_cap: A :ref:`LINE_CAP` string.
 
         """
-        cairo.cairo_set_line_cap(self._pointer, line_cap)
+        _cairo_set_line_cap(self._pointer, line_cap)
         self._check_status()
 
     def get_line_cap(self):
         """Return the current :ref:`LINE_CAP` string."""
-        return cairo.cairo_get_line_cap(self._pointer)
+        return _cairo_get_line_cap(self._pointer)
 
     def set_line_join(self, line_join):
         """Set the current :ref:`LINE_JOIN` within the cairo context.
@@ -539,12 +775,12 @@ class Context(object):
         :param line_join: A :ref:`LINE_JOIN` string.
 
         """
-        cairo.cairo_set_line_join(self._pointer, line_join)
+        _cairo_set_line_join(self._pointer, line_join)
         self._check_status()
 
     def get_line_join(self):
         """Return the current :ref:`LINE_JOIN` string."""
-        return cairo.cairo_get_line_join(self._pointer)
+        return _cairo_get_line_join(self._pointer)
 
     def set_line_width(self, width):
         """Sets the current line width within the cairo context.
@@ -577,12 +813,12 @@ class Context(object):
         :param width: The new line width.
 
         """
-        cairo.cairo_set_line_width(self._pointer, width)
+        _cairo_set_line_width(self._pointer, width)
         self._check_status()
 
     def get_line_width(self):
         """Return the current line width as a float."""
-        return cairo.cairo_get_line_width(self._pointer)
+        return _cairo_get_line_width(self._pointer)
 
     def set_miter_limit(self, limit):
         """Sets the current miter limit within the cairo context.
@@ -614,12 +850,12 @@ class Context(object):
         :type limit: float
 
         """
-        cairo.cairo_set_miter_limit(self._pointer, limit)
+        _cairo_set_miter_limit(self._pointer, limit)
         self._check_status()
 
     def get_miter_limit(self):
         """Return the current miter limit as a float."""
-        return cairo.cairo_get_miter_limit(self._pointer)
+        return _cairo_get_miter_limit(self._pointer)
 
     def set_operator(self, operator):
         """Set the current :ref:`OPERATOR`
@@ -630,12 +866,12 @@ class Context(object):
         :param operator: A :ref:`OPERATOR` string.
 
         """
-        cairo.cairo_set_operator(self._pointer, operator)
+        _cairo_set_operator(self._pointer, operator)
         self._check_status()
 
     def get_operator(self):
         """Return the current :ref:`OPERATOR` string."""
-        return cairo.cairo_get_operator(self._pointer)
+        return _cairo_get_operator(self._pointer)
 
     def set_tolerance(self, tolerance):
         """Sets the tolerance used when converting paths into trapezoids.
@@ -656,12 +892,12 @@ class Context(object):
         :param tolerance: The tolerance, in device units (typically pixels)
 
         """
-        cairo.cairo_set_tolerance(self._pointer, tolerance)
+        _cairo_set_tolerance(self._pointer, tolerance)
         self._check_status()
 
     def get_tolerance(self):
         """Return the current tolerance as a float."""
-        return cairo.cairo_get_tolerance(self._pointer)
+        return _cairo_get_tolerance(self._pointer)
 
     #
     #  CTM: Current transformation matrix
@@ -681,7 +917,7 @@ class Context(object):
         :type ty: float
 
         """
-        cairo.cairo_translate(self._pointer, tx, ty)
+        _cairo_translate(self._pointer, tx, ty)
         self._check_status()
 
     def scale(self, sx, sy=None):
@@ -702,7 +938,7 @@ class Context(object):
         """
         if sy is None:
             sy = sx
-        cairo.cairo_scale(self._pointer, sx, sy)
+        _cairo_scale(self._pointer, sx, sy)
         self._check_status()
 
     def rotate(self, radians):
@@ -721,7 +957,7 @@ class Context(object):
             positive angles rotate in a clockwise direction.
 
         """
-        cairo.cairo_rotate(self._pointer, radians)
+        _cairo_rotate(self._pointer, radians)
         self._check_status()
 
     def transform(self, matrix):
@@ -735,7 +971,7 @@ class Context(object):
             to be applied to the user-space axes.
 
         """
-        cairo.cairo_transform(self._pointer, matrix._pointer)
+        _cairo_transform(self._pointer, matrix._pointer)
         self._check_status()
 
     def set_matrix(self, matrix):
@@ -746,13 +982,13 @@ class Context(object):
             A transformation :class:`Matrix` from user space to device space.
 
         """
-        cairo.cairo_set_matrix(self._pointer, matrix._pointer)
+        _cairo_set_matrix(self._pointer, matrix._pointer)
         self._check_status()
 
     def get_matrix(self):
         """Return a copy of the current transformation matrix (CTM)."""
         matrix = Matrix()
-        cairo.cairo_get_matrix(self._pointer, matrix._pointer)
+        _cairo_get_matrix(self._pointer, matrix._pointer)
         self._check_status()
         return matrix
 
@@ -763,7 +999,7 @@ class Context(object):
         and one user-space unit will transform to one device-space unit.
 
         """
-        cairo.cairo_identity_matrix(self._pointer)
+        _cairo_identity_matrix(self._pointer)
         self._check_status()
 
     def user_to_device(self, x, y):
@@ -778,10 +1014,13 @@ class Context(object):
         :returns: A ``(device_x, device_y)`` tuple of floats.
 
         """
-        xy = ffi.new('double[2]', [x, y])
-        cairo.cairo_user_to_device(self._pointer, xy + 0, xy + 1)
+        xy = self._doubles
+        xy[0] = x
+        xy[1] = y
+        x_pointer, y_pointer, _, _ = self._double_pointers
+        _cairo_user_to_device(self._pointer, x_pointer, y_pointer)
         self._check_status()
-        return tuple(xy)
+        return xy[0], xy[1]
 
     def user_to_device_distance(self, dx, dy):
         """Transform a distance vector from user space to device space.
@@ -796,10 +1035,14 @@ class Context(object):
         :returns: A ``(device_dx, device_dy)`` tuple of floats.
 
         """
-        xy = ffi.new('double[2]', [dx, dy])
-        cairo.cairo_user_to_device_distance(self._pointer, xy + 0, xy + 1)
+        xy = self._doubles
+        xy[0] = dx
+        xy[1] = dy
+        x_pointer, y_pointer, _, _ = self._double_pointers
+        _cairo_user_to_device_distance(
+            self._pointer, x_pointer, y_pointer)
         self._check_status()
-        return tuple(xy)
+        return xy[0], xy[1]
 
     def device_to_user(self, x, y):
         """Transform a coordinate from device space to user space
@@ -813,10 +1056,13 @@ class Context(object):
         :returns: A ``(user_x, user_y)`` tuple of floats.
 
         """
-        xy = ffi.new('double[2]', [x, y])
-        cairo.cairo_device_to_user(self._pointer, xy + 0, xy + 1)
+        xy = self._doubles
+        xy[0] = x
+        xy[1] = y
+        x_pointer, y_pointer, _, _ = self._double_pointers
+        _cairo_device_to_user(self._pointer, x_pointer, y_pointer)
         self._check_status()
-        return tuple(xy)
+        return xy[0], xy[1]
 
     def device_to_user_distance(self, dx, dy):
         """Transform a distance vector from device space to user space.
@@ -831,10 +1077,14 @@ class Context(object):
         :returns: A ``(user_dx, user_dy)`` tuple of floats.
 
         """
-        xy = ffi.new('double[2]', [dx, dy])
-        cairo.cairo_device_to_user_distance(self._pointer, xy + 0, xy + 1)
+        xy = self._doubles
+        xy[0] = dx
+        xy[1] = dy
+        x_pointer, y_pointer, _, _ = self._double_pointers
+        _cairo_device_to_user_distance(
+            self._pointer, x_pointer, y_pointer)
         self._check_status()
-        return tuple(xy)
+        return xy[0], xy[1]
 
     #
     #  Path
@@ -845,7 +1095,7 @@ class Context(object):
         See :meth:`get_current_point`.
 
         """
-        return bool(cairo.cairo_has_current_point(self._pointer))
+        return bool(_cairo_has_current_point(self._pointer))
 
     def get_current_point(self):
         """Return the current point of the current path,
@@ -892,17 +1142,18 @@ class Context(object):
         """
         # I’d prefer returning None if self.has_current_point() is False
         # But keep (0, 0) for compat with pycairo.
-        xy = ffi.new('double[2]')
-        cairo.cairo_get_current_point(self._pointer, xy + 0, xy + 1)
+        xy = self._doubles
+        x_pointer, y_pointer, _, _ = self._double_pointers
+        _cairo_get_current_point(self._pointer, x_pointer, y_pointer)
         self._check_status()
-        return tuple(xy)
+        return xy[0], xy[1]
 
     def new_path(self):
         """ Clears the current path.
         After this call there will be no path and no current point.
 
         """
-        cairo.cairo_new_path(self._pointer)
+        _cairo_new_path(self._pointer)
         self._check_status()
 
     def new_sub_path(self):
@@ -920,7 +1171,7 @@ class Context(object):
         for a call to :meth:`move_to`.
 
         """
-        cairo.cairo_new_sub_path(self._pointer)
+        _cairo_new_sub_path(self._pointer)
         self._check_status()
 
     def move_to(self, x, y):
@@ -933,7 +1184,7 @@ class Context(object):
         :type float: y
 
         """
-        cairo.cairo_move_to(self._pointer, x, y)
+        _cairo_move_to(self._pointer, x, y)
         self._check_status()
 
     def rel_move_to(self, dx, dy):
@@ -953,7 +1204,7 @@ class Context(object):
             Doing so will cause leave the context in an error state.
 
         """
-        cairo.cairo_rel_move_to(self._pointer, dx, dy)
+        _cairo_rel_move_to(self._pointer, dx, dy)
         self._check_status()
 
     def line_to(self, x, y):
@@ -970,7 +1221,7 @@ class Context(object):
         :type float: y
 
         """
-        cairo.cairo_line_to(self._pointer, x, y)
+        _cairo_line_to(self._pointer, x, y)
         self._check_status()
 
     def rel_line_to(self, dx, dy):
@@ -993,7 +1244,7 @@ class Context(object):
             Doing so will cause leave the context in an error state.
 
         """
-        cairo.cairo_rel_line_to(self._pointer, dx, dy)
+        _cairo_rel_line_to(self._pointer, dx, dy)
         self._check_status()
 
     def rectangle(self, x, y, width, height):
@@ -1019,7 +1270,7 @@ class Context(object):
         :type float: heigth
 
         """
-        cairo.cairo_rectangle(self._pointer, x, y, width, height)
+        _cairo_rectangle(self._pointer, x, y, width, height)
         self._check_status()
 
     def arc(self, xc, yc, radius, angle1, angle2):
@@ -1080,7 +1331,7 @@ class Context(object):
         :type angle2: float
 
         """
-        cairo.cairo_arc(self._pointer, xc, yc, radius, angle1, angle2)
+        _cairo_arc(self._pointer, xc, yc, radius, angle1, angle2)
         self._check_status()
 
     def arc_negative(self, xc, yc, radius, angle1, angle2):
@@ -1109,7 +1360,7 @@ class Context(object):
         :type angle2: float
 
         """
-        cairo.cairo_arc_negative(self._pointer, xc, yc, radius, angle1, angle2)
+        _cairo_arc_negative(self._pointer, xc, yc, radius, angle1, angle2)
         self._check_status()
 
     def curve_to(self, x1, y1, x2, y2, x3, y3):
@@ -1137,7 +1388,7 @@ class Context(object):
         :type y3: float
 
         """
-        cairo.cairo_curve_to(self._pointer, x1, y1, x2, y2, x3, y3)
+        _cairo_curve_to(self._pointer, x1, y1, x2, y2, x3, y3)
         self._check_status()
 
     def rel_curve_to(self, dx1, dy1, dx2, dy2, dx3, dy3):
@@ -1171,7 +1422,7 @@ class Context(object):
             Doing so will cause leave the context in an error state.
 
         """
-        cairo.cairo_rel_curve_to(self._pointer, dx1, dy1, dx2, dy2, dx3, dy3)
+        _cairo_rel_curve_to(self._pointer, dx1, dy1, dx2, dy2, dx3, dy3)
         self._check_status()
 
     def text_path(self, text):
@@ -1201,7 +1452,7 @@ class Context(object):
             and :meth:`glyph_path` for the "real" text path API in cairo.
 
         """
-        cairo.cairo_text_path(self._pointer, _encode_string(text))
+        _cairo_text_path(self._pointer, _encode_string(text))
         self._check_status()
 
     def glyph_path(self, glyphs):
@@ -1215,7 +1466,7 @@ class Context(object):
 
         """
         glyphs = ffi.new('cairo_glyph_t[]', glyphs)
-        cairo.cairo_glyph_path(self._pointer, glyphs, len(glyphs))
+        _cairo_glyph_path(self._pointer, glyphs, len(glyphs))
         self._check_status()
 
     def close_path(self):
@@ -1239,7 +1490,7 @@ class Context(object):
         this method will have no effect.
 
         """
-        cairo.cairo_close_path(self._pointer)
+        _cairo_close_path(self._pointer)
         self._check_status()
 
     def copy_path(self):
@@ -1258,9 +1509,9 @@ class Context(object):
             * :obj:`CLOSE_PATH <PATH_CLOSE_PATH>` 0 points ``()`` (empty tuple)
 
         """
-        path = cairo.cairo_copy_path(self._pointer)
+        path = _cairo_copy_path(self._pointer)
         result = list(_iter_path(path))
-        cairo.cairo_path_destroy(path)
+        _cairo_path_destroy(path)
         return result
 
     def copy_path_flat(self):
@@ -1282,9 +1533,49 @@ class Context(object):
             See :meth:`copy_path` for the data structure.
 
         """
-        path = cairo.cairo_copy_path_flat(self._pointer)
+        path = _cairo_copy_path_flat(self._pointer)
         result = list(_iter_path(path))
-        cairo.cairo_path_destroy(path)
+        _cairo_path_destroy(path)
+        return result
+
+    def copy_path_array(self):
+        """Return a copy of the current path, stored in flat arrays.
+
+        This method is like :meth:`copy_path`,
+        but avoids creating a Python tuple for each portion of the path.
+
+        :returns: A :class:`PathData` tuple.
+
+        *New in cairocffi 1.5.*
+
+        """
+        path = _cairo_copy_path(self._pointer)
+        result = _path_data(path)
+        _cairo_path_destroy(path)
+        return result
+
+    def copy_path_types(self, flat=False):
+        """Return the operations of the current path, without their points.
+
+        :type flat: bool
+        :param flat:
+            Whether curves are flattened first, as in :meth:`copy_path_flat`.
+        :returns:
+            A :class:`bytes` object
+            with one :ref:`PATH_OPERATION` value per byte,
+            the same as the :obj:`~PathData.types` of :meth:`copy_path_array`.
+            ``numpy.frombuffer(types, dtype=numpy.uint8)``
+            gives an array of these values.
+
+        *New in cairocffi 1.5.*
+
+        """
+        if flat:
+            path = _cairo_copy_path_flat(self._pointer)
+        else:
+            path = _cairo_copy_path(self._pointer)
+        result = _path_data(path, with_points=False).types
+        _cairo_path_destroy(path)
         return result
 
     def append_path(self, path):
@@ -1294,13 +1585,15 @@ class Context(object):
 
         :param path:
             An iterable of tuples
-            in the same format as returned by :meth:`copy_path`.
+            in the same format as returned by :meth:`copy_path`,
+            or a :class:`PathData` tuple
+            as returned by :meth:`copy_path_array`.
 
         """
         # Both objects need to stay alive
-        # until after cairo.cairo_append_path() is finished, but not after.
+        # until after _cairo_append_path() is finished, but not after.
         path, _ = _encode_path(path)
-        cairo.cairo_append_path(self._pointer, path)
+        _cairo_append_path(self._pointer, path)
         self._check_status()
 
     def path_extents(self):
@@ -1335,11 +1628,9 @@ class Context(object):
             respectively.
 
         """
-        extents = ffi.new('double[4]')
-        cairo.cairo_path_extents(
-            self._pointer, extents + 0, extents + 1, extents + 2, extents + 3)
+        _cairo_path_extents(self._pointer, *self._double_pointers)
         self._check_status()
-        return tuple(extents)
+        return tuple(self._doubles)
 
     #
     #  Drawing operators
@@ -1350,7 +1641,7 @@ class Context(object):
         within the current clip region.
 
         """
-        cairo.cairo_paint(self._pointer)
+        _cairo_paint(self._pointer)
         self._check_status()
 
     def paint_with_alpha(self, alpha):
@@ -1364,7 +1655,7 @@ class Context(object):
         :param alpha: Alpha value, between 0 (transparent) and 1 (opaque).
 
         """
-        cairo.cairo_paint_with_alpha(self._pointer, alpha)
+        _cairo_paint_with_alpha(self._pointer, alpha)
         self._check_status()
 
     def mask(self, pattern):
@@ -1376,7 +1667,7 @@ class Context(object):
         :param pattern: A :class:`Pattern` object.
 
         """
-        cairo.cairo_mask(self._pointer, pattern._pointer)
+        _cairo_mask(self._pointer, pattern._pointer)
         self._check_status()
 
     def mask_surface(self, surface, surface_x=0, surface_y=0):
@@ -1392,7 +1683,7 @@ class Context(object):
         :type surface_y: float
 
         """
-        cairo.cairo_mask_surface(
+        _cairo_mask_surface(
             self._pointer, surface._pointer, surface_x, surface_y)
         self._check_status()
 
@@ -1406,7 +1697,7 @@ class Context(object):
         See :meth:`set_fill_rule` and :meth:`fill_preserve`.
 
         """
-        cairo.cairo_fill(self._pointer)
+        _cairo_fill(self._pointer)
         self._check_status()
 
     def fill_preserve(self):
@@ -1419,7 +1710,7 @@ class Context(object):
         See :meth:`set_fill_rule` and :meth:`fill`.
 
         """
-        cairo.cairo_fill_preserve(self._pointer)
+        _cairo_fill_preserve(self._pointer)
         self._check_status()
 
     def fill_extents(self):
@@ -1447,11 +1738,9 @@ class Context(object):
             respectively.
 
         """
-        extents = ffi.new('double[4]')
-        cairo.cairo_fill_extents(
-            self._pointer, extents + 0, extents + 1, extents + 2, extents + 3)
+        _cairo_fill_extents(self._pointer, *self._double_pointers)
         self._check_status()
-        return tuple(extents)
+        return tuple(self._doubles)
 
     def in_fill(self, x, y):
         """Tests whether the given point is inside the area
@@ -1468,7 +1757,7 @@ class Context(object):
         :returns: A boolean.
 
         """
-        return bool(cairo.cairo_in_fill(self._pointer, x, y))
+        return bool(_cairo_in_fill(self._pointer, x, y))
 
     def stroke(self):
         """A drawing operator that strokes the current path
@@ -1506,7 +1795,7 @@ class Context(object):
         in the case of either degenerate segments or sub-paths.
 
         """
-        cairo.cairo_stroke(self._pointer)
+        _cairo_stroke(self._pointer)
         self._check_status()
 
     def stroke_preserve(self):
@@ -1519,7 +1808,7 @@ class Context(object):
         :meth:`set_line_cap`, :meth:`set_dash`, and :meth:`stroke`.
 
         """
-        cairo.cairo_stroke_preserve(self._pointer)
+        _cairo_stroke_preserve(self._pointer)
         self._check_status()
 
     def stroke_extents(self):
@@ -1551,11 +1840,9 @@ class Context(object):
             respectively.
 
         """
-        extents = ffi.new('double[4]')
-        cairo.cairo_stroke_extents(
-            self._pointer, extents + 0, extents + 1, extents + 2, extents + 3)
+        _cairo_stroke_extents(self._pointer, *self._double_pointers)
         self._check_status()
-        return tuple(extents)
+        return tuple(self._doubles)
 
     def in_stroke(self, x, y):
         """Tests whether the given point is inside the area
@@ -1573,7 +1860,7 @@ class Context(object):
         :returns: A boolean.
 
         """
-        return bool(cairo.cairo_in_stroke(self._pointer, x, y))
+        return bool(_cairo_in_stroke(self._pointer, x, y))
 
     def clip(self):
         """Establishes a new clip region
@@ -1597,7 +1884,7 @@ class Context(object):
         is :meth:`reset_clip`.
 
         """
-        cairo.cairo_clip(self._pointer)
+        _cairo_clip(self._pointer)
         self._check_status()
 
     def clip_preserve(self):
@@ -1623,7 +1910,7 @@ class Context(object):
         is :meth:`reset_clip`.
 
         """
-        cairo.cairo_clip_preserve(self._pointer)
+        _cairo_clip_preserve(self._pointer)
         self._check_status()
 
     def clip_extents(self):
@@ -1636,11 +1923,9 @@ class Context(object):
             respectively.
 
         """
-        extents = ffi.new('double[4]')
-        cairo.cairo_clip_extents(
-            self._pointer, extents + 0, extents + 1, extents + 2, extents + 3)
+        _cairo_clip_extents(self._pointer, *self._double_pointers)
         self._check_status()
-        return tuple(extents)
+        return tuple(self._doubles)
 
     def copy_clip_rectangle_list(self):
         """Return the current clip region as a list of rectangles
@@ -1655,15 +1940,18 @@ class Context(object):
             of user-space rectangles.
 
         """
-        rectangle_list = cairo.cairo_copy_clip_rectangle_list(self._pointer)
-        _check_status(rectangle_list.status)
-        rectangles = rectangle_list.rectangles
-        result = []
-        for i in range(rectangle_list.num_rectangles):
-            rect = rectangles[i]
-            result.append((rect.x, rect.y, rect.width, rect.height))
-        cairo.cairo_rectangle_list_destroy(rectangle_list)
-        return result
+        rectangle_list = _cairo_copy_clip_rectangle_list(self._pointer)
+        try:
+            _check_status(rectangle_list.status)
+            # Rectangles are stored as 4 contiguous doubles each,
+            # converted to floats at once instead of field by field
+            values = iter(memoryview(ffi.buffer(
+                rectangle_list.rectangles,
+                rectangle_list.num_rectangles * _RECTANGLE_SIZE,
+            )).cast('d').tolist())
+        finally:
+            _cairo_rectangle_list_destroy(rectangle_list)
+        return list(zip(values, values, values, values))
 
     def in_clip(self, x, y):
         """Tests whether the given point is inside the area
@@ -1699,7 +1987,7 @@ class Context(object):
         as a more robust means of temporarily restricting the clip region.
 
         """
-        cairo.cairo_reset_clip(self._pointer)
+        _cairo_reset_clip(self._pointer)
         self._check_status()
 
     #
@@ -1747,7 +2035,7 @@ class Context(object):
         followed by :meth:`set_font_face`.
 
         """
-        cairo.cairo_select_font_face(
+        _cairo_select_font_face(
             self._pointer, _encode_string(family), slant, weight)
         self._check_status()
 
@@ -1760,7 +2048,7 @@ class Context(object):
 
         """
         font_face = font_face._pointer if font_face is not None else ffi.NULL
-        cairo.cairo_set_font_face(self._pointer, font_face)
+        _cairo_set_font_face(self._pointer, font_face)
         self._check_status()
 
     def get_font_face(self):
@@ -1772,7 +2060,7 @@ class Context(object):
 
         """
         return FontFace._from_pointer(
-            cairo.cairo_get_font_face(self._pointer), incref=True)
+            _cairo_get_font_face(self._pointer), incref=True)
 
     def set_font_size(self, size):
         """Sets the current font matrix to a scale by a factor of :obj:`size`,
@@ -1790,7 +2078,7 @@ class Context(object):
         :type size: float
 
         """
-        cairo.cairo_set_font_size(self._pointer, size)
+        _cairo_set_font_size(self._pointer, size)
         self._check_status()
 
     def set_font_matrix(self, matrix):
@@ -1808,7 +2096,7 @@ class Context(object):
             describing a transform to be applied to the current font.
 
         """
-        cairo.cairo_set_font_matrix(self._pointer, matrix._pointer)
+        _cairo_set_font_matrix(self._pointer, matrix._pointer)
         self._check_status()
 
     def get_font_matrix(self):
@@ -1818,7 +2106,7 @@ class Context(object):
 
         """
         matrix = Matrix()
-        cairo.cairo_get_font_matrix(self._pointer, matrix._pointer)
+        _cairo_get_font_matrix(self._pointer, matrix._pointer)
         self._check_status()
         return matrix
 
@@ -1833,7 +2121,7 @@ class Context(object):
         :param font_options: A :class:`FontOptions` object.
 
         """
-        cairo.cairo_set_font_options(self._pointer, font_options._pointer)
+        _cairo_set_font_options(self._pointer, font_options._pointer)
         self._check_status()
 
     def get_font_options(self):
@@ -1846,7 +2134,7 @@ class Context(object):
 
         """
         font_options = FontOptions()
-        cairo.cairo_get_font_options(self._pointer, font_options._pointer)
+        _cairo_get_font_options(self._pointer, font_options._pointer)
         return font_options
 
     def set_scaled_font(self, scaled_font):
@@ -1859,7 +2147,7 @@ class Context(object):
         :param scaled_font: A :class:`ScaledFont` object.
 
         """
-        cairo.cairo_set_scaled_font(self._pointer, scaled_font._pointer)
+        _cairo_set_scaled_font(self._pointer, scaled_font._pointer)
         self._check_status()
 
     def get_scaled_font(self):
@@ -1871,7 +2159,7 @@ class Context(object):
 
         """
         return ScaledFont._from_pointer(
-            cairo.cairo_get_scaled_font(self._pointer), incref=True)
+            _cairo_get_scaled_font(self._pointer), incref=True)
 
     def font_extents(self):
         """Return the extents of the currently selected font.
@@ -1924,7 +2212,7 @@ class Context(object):
 
         """
         extents = ffi.new('cairo_font_extents_t *')
-        cairo.cairo_font_extents(self._pointer, extents)
+        _cairo_font_extents(self._pointer, extents)
         self._check_status()
         # returning extents as is would be a nice API,
         # but return a tuple for compat with pycairo.
@@ -1999,7 +2287,7 @@ class Context(object):
 
         """
         extents = ffi.new('cairo_text_extents_t *')
-        cairo.cairo_text_extents(self._pointer, _encode_string(text), extents)
+        _cairo_text_extents(self._pointer, _encode_string(text), extents)
         self._check_status()
         # returning extents as is would be a nice API,
         # but return a tuple for compat with pycairo.
@@ -2029,7 +2317,7 @@ class Context(object):
         """
         glyphs = ffi.new('cairo_glyph_t[]', glyphs)
         extents = ffi.new('cairo_text_extents_t *')
-        cairo.cairo_glyph_extents(
+        _cairo_glyph_extents(
             self._pointer, glyphs, len(glyphs), extents)
         self._check_status()
         return (
@@ -2072,7 +2360,7 @@ class Context(object):
             and :meth:`show_glyphs` for the "real" text display API in cairo.
 
         """
-        cairo.cairo_show_text(self._pointer, _encode_string(text))
+        _cairo_show_text(self._pointer, _encode_string(text))
         self._check_status()
 
     def show_glyphs(self, glyphs):
@@ -2089,7 +2377,7 @@ class Context(object):
 
         """
         glyphs = ffi.new('cairo_glyph_t[]', glyphs)
-        cairo.cairo_show_glyphs(self._pointer, glyphs, len(glyphs))
+        _cairo_show_glyphs(self._pointer, glyphs, len(glyphs))
         self._check_status()
 
     def show_text_glyphs(self, text, glyphs, clusters, cluster_flags=0):
@@ -2154,7 +2442,7 @@ class Context(object):
         """
         glyphs = ffi.new('cairo_glyph_t[]', glyphs)
         clusters = ffi.new('cairo_text_cluster_t[]', clusters)
-        cairo.cairo_show_text_glyphs(
+        _cairo_show_text_glyphs(
             self._pointer, _encode_string(text), -1,
             glyphs, len(glyphs), clusters, len(clusters), cluster_flags)
         self._check_status()
@@ -2173,8 +2461,9 @@ class Context(object):
         on the context’s target.
 
         """
-        cairo.cairo_show_page(self._pointer)
+        _cairo_show_page(self._pointer)
         self._check_status()
+        _flush_memory_writer(_cairo_get_target(self._pointer))
 
     def copy_page(self):
         """Emits the current page  for backends that support multiple pages,
@@ -2188,8 +2477,9 @@ class Context(object):
         on the context’s target.
 
         """
-        cairo.cairo_copy_page(self._pointer)
+        _cairo_copy_page(self._pointer)
         self._check_status()
+        _flush_memory_writer(_cairo_get_target(self._pointer))
 
     #
     #  Tags
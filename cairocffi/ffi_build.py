@@ -9,6 +9,7 @@
 
 """
 
+import os
 from importlib.util import module_from_spec, spec_from_file_location
 from pathlib import Path
 
@@ -37,6 +38,62 @@ try:
 except ImportError:
     pass
 
+# Optional API-mode cffi definitions, compiled against cairo headers.
+# Only built when the CAIROCFFI_API_MODE environment variable is set to 1,
+# see setup.py. Windows and Quartz declarations are left out, as their
+# headers are not available on every platform.
+ffi_api = FFI()
+ffi_api.set_source('cairocffi._generated._cairo', '''
+    #include <stdlib.h>
+    #include <string.h>
+    #include <cairo.h>
+    #include <cairo-pdf.h>
+    #include <cairo-ps.h>
+    #include <cairo-svg.h>
+
+    typedef struct {
+        unsigned char *data;
+        size_t length;
+        size_t size;
+    } cairocffi_buffer_t;
+
+    static cairo_status_t cairocffi_buffer_write(
+            void *closure, const unsigned char *data, unsigned int length) {
+        cairocffi_buffer_t *buffer = closure;
+        if (buffer->length + length > buffer->size) {
+            size_t size = buffer->size ? buffer->size : 4096;
+            unsigned char *new_data;
+            while (size < buffer->length + length)
+                size *= 2;
+            new_data = realloc(buffer->data, size);
+            if (new_data == NULL)
+                return CAIRO_STATUS_WRITE_ERROR;
+            buffer->data = new_data;
+            buffer->size = size;
+        }
+        memcpy(buffer->data + buffer->length, data, length);
+        buffer->length += length;
+        return CAIRO_STATUS_SUCCESS;
+    }
+
+    static void cairocffi_buffer_free(cairocffi_buffer_t *buffer) {
+        free(buffer->data);
+    }
+''', libraries=['cairo'])
+ffi_api.cdef(constants._CAIRO_HEADERS.split('typedef void* HDC;')[0])
+# In-memory output streams, written without Python callbacks
+ffi_api.cdef('''
+    typedef struct {
+        unsigned char *data;
+        size_t length;
+        size_t size;
+    } cairocffi_buffer_t;
+
+    cairo_status_t cairocffi_buffer_write(
+        void *closure, const unsigned char *data, unsigned int length);
+    void cairocffi_buffer_free(cairocffi_buffer_t *buffer);
+''')
+
 # gdk pixbuf cffi definitions
 ffi_pixbuf = FFI()
 ffi_pixbuf.set_source('cairocffi._generated.ffi_pixbuf', None)
@@ -105,3 +162,5 @@ ffi_pixbuf.cdef('''
 if __name__ == '__main__':
     ffi.compile()
     ffi_pixbuf.compile()
+    if os.environ.get('CAIROCFFI_API_MODE') == '1':
+        ffi_api.compile()
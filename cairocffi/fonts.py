@@ -12,6 +12,27 @@
 from . import _check_status, _keepref, cairo, constants, ffi
 from .matrix import Matrix
 
+# Number of text extents kept by each ScaledFont object
+_TEXT_EXTENTS_CACHE_SIZE = 256
+
+_cairo_font_face_status = cairo.cairo_font_face_status
+_cairo_font_options_status = cairo.cairo_font_options_status
+_cairo_glyph_free = cairo.cairo_glyph_free
+_cairo_scaled_font_create = cairo.cairo_scaled_font_create
+_cairo_scaled_font_destroy = cairo.cairo_scaled_font_destroy
+_cairo_scaled_font_extents = cairo.cairo_scaled_font_extents
+_cairo_scaled_font_get_ctm = cairo.cairo_scaled_font_get_ctm
+_cairo_scaled_font_get_font_face = cairo.cairo_scaled_font_get_font_face
+_cairo_scaled_font_get_font_matrix = cairo.cairo_scaled_font_get_font_matrix
+_cairo_scaled_font_get_font_options = cairo.cairo_scaled_font_get_font_options
+_cairo_scaled_font_get_scale_matrix = cairo.cairo_scaled_font_get_scale_matrix
+_cairo_scaled_font_glyph_extents = cairo.cairo_scaled_font_glyph_extents
+_cairo_scaled_font_reference = cairo.cairo_scaled_font_reference
+_cairo_scaled_font_status = cairo.cairo_scaled_font_status
+_cairo_scaled_font_text_extents = cairo.cairo_scaled_font_text_extents
+_cairo_scaled_font_text_to_glyphs = cairo.cairo_scaled_font_text_to_glyphs
+_cairo_text_cluster_free = cairo.cairo_text_cluster_free
+
 
 def _encode_string(string):
     """Return a byte string, encoding Unicode with UTF-8."""
@@ -34,7 +55,7 @@ class FontFace(object):
         self._check_status()
 
     def _check_status(self):
-        _check_status(cairo.cairo_font_face_status(self._pointer))
+        _check_status(_cairo_font_face_status(self._pointer))
 
     @staticmethod
     def _from_pointer(pointer, incref):
@@ -131,17 +152,19 @@ class ScaledFont(object):
             ctm = Matrix()
         if options is None:
             options = FontOptions()
-        self._init_pointer(cairo.cairo_scaled_font_create(
+        self._init_pointer(_cairo_scaled_font_create(
             font_face._pointer, font_matrix._pointer,
             ctm._pointer, options._pointer))
 
     def _init_pointer(self, pointer):
         self._pointer = ffi.gc(
-            pointer, _keepref(cairo, cairo.cairo_scaled_font_destroy))
+            pointer, _keepref(cairo, _cairo_scaled_font_destroy))
+        # Scaled fonts are immutable, their text extents can be cached
+        self._text_extents = {}
         self._check_status()
 
     def _check_status(self):
-        _check_status(cairo.cairo_scaled_font_status(self._pointer))
+        _check_status(_cairo_scaled_font_status(self._pointer))
 
     @staticmethod
     def _from_pointer(pointer, incref):
@@ -156,7 +179,7 @@ class ScaledFont(object):
         if pointer == ffi.NULL:
             raise ValueError('Null pointer')
         if incref:
-            cairo.cairo_scaled_font_reference(pointer)
+            _cairo_scaled_font_reference(pointer)
         self = object.__new__(ScaledFont)
         ScaledFont._init_pointer(self, pointer)
         return self
@@ -171,7 +194,7 @@ class ScaledFont(object):
 
         """
         return FontFace._from_pointer(
-            cairo.cairo_scaled_font_get_font_face(self._pointer), incref=True)
+            _cairo_scaled_font_get_font_face(self._pointer), incref=True)
 
     def get_font_options(self):
         """Copies the scaled font’s options.
@@ -180,7 +203,7 @@ class ScaledFont(object):
 
         """
         font_options = FontOptions()
-        cairo.cairo_scaled_font_get_font_options(
+        _cairo_scaled_font_get_font_options(
             self._pointer, font_options._pointer)
         return font_options
 
@@ -191,7 +214,7 @@ class ScaledFont(object):
 
         """
         matrix = Matrix()
-        cairo.cairo_scaled_font_get_font_matrix(self._pointer, matrix._pointer)
+        _cairo_scaled_font_get_font_matrix(self._pointer, matrix._pointer)
         self._check_status()
         return matrix
 
@@ -206,7 +229,7 @@ class ScaledFont(object):
 
         """
         matrix = Matrix()
-        cairo.cairo_scaled_font_get_ctm(self._pointer, matrix._pointer)
+        _cairo_scaled_font_get_ctm(self._pointer, matrix._pointer)
         self._check_status()
         return matrix
 
@@ -221,7 +244,7 @@ class ScaledFont(object):
 
         """
         matrix = Matrix()
-        cairo.cairo_scaled_font_get_scale_matrix(
+        _cairo_scaled_font_get_scale_matrix(
             self._pointer, matrix._pointer)
         self._check_status()
         return matrix
@@ -236,7 +259,7 @@ class ScaledFont(object):
 
         """
         extents = ffi.new('cairo_font_extents_t *')
-        cairo.cairo_scaled_font_extents(self._pointer, extents)
+        _cairo_scaled_font_extents(self._pointer, extents)
         self._check_status()
         return (
             extents.ascent, extents.descent, extents.height,
@@ -258,15 +281,25 @@ class ScaledFont(object):
             tuple of floats.
             See :meth:`Context.text_extents` for details.
 
+        The extents of the last measured strings are cached.
+
         """
-        extents = ffi.new('cairo_text_extents_t *')
-        cairo.cairo_scaled_font_text_extents(
-            self._pointer, _encode_string(text), extents)
-        self._check_status()
-        return (
-            extents.x_bearing, extents.y_bearing,
-            extents.width, extents.height,
-            extents.x_advance, extents.y_advance)
+        # Least recently used strings are first in the dict
+        cache = self._text_extents
+        result = cache.pop(text, None)
+        if result is None:
+            extents = ffi.new('cairo_text_extents_t *')
+            _cairo_scaled_font_text_extents(
+                self._pointer, _encode_string(text), extents)
+            self._check_status()
+            result = (
+                extents.x_bearing, extents.y_bearing,
+                extents.width, extents.height,
+                extents.x_advance, extents.y_advance)
+            if len(cache) >= _TEXT_EXTENTS_CACHE_SIZE:
+                del cache[next(iter(cache))]
+        cache[text] = result
+        return result
 
     def glyph_extents(self, glyphs):
         """Returns the extents for a list of glyphs.
@@ -290,7 +323,7 @@ class ScaledFont(object):
         """
         glyphs = ffi.new('cairo_glyph_t[]', glyphs)
         extents = ffi.new('cairo_text_extents_t *')
-        cairo.cairo_scaled_font_glyph_extents(
+        _cairo_scaled_font_glyph_extents(
             self._pointer, glyphs, len(glyphs), extents)
         self._check_status()
         return (
@@ -344,13 +377,13 @@ class ScaledFont(object):
             num_clusters = ffi.NULL
             cluster_flags = ffi.NULL
         # TODO: Pass len_utf8 explicitly to support NULL bytes?
-        status = cairo.cairo_scaled_font_text_to_glyphs(
+        status = _cairo_scaled_font_text_to_glyphs(
             self._pointer, x, y, _encode_string(text), -1,
             glyphs, num_glyphs, clusters, num_clusters, cluster_flags)
-        glyphs = ffi.gc(glyphs[0], _keepref(cairo, cairo.cairo_glyph_free))
+        glyphs = ffi.gc(glyphs[0], _keepref(cairo, _cairo_glyph_free))
         if with_clusters:
             clusters = ffi.gc(
-                clusters[0], _keepref(cairo, cairo.cairo_text_cluster_free))
+                clusters[0], _keepref(cairo, _cairo_text_cluster_free))
         _check_status(status)
         glyphs = [
             (glyph.index, glyph.x, glyph.y)
@@ -399,7 +432,7 @@ class FontOptions(object):
         self._check_status()
 
     def _check_status(self):
-        _check_status(cairo.cairo_font_options_status(self._pointer))
+        _check_status(_cairo_font_options_status(self._pointer))
 
     def copy(self):
         """Return a new :class:`FontOptions` with the same values."""
@@ -417,7 +450,7 @@ class FontOptions(object):
 
         """
         cairo.cairo_font_options_merge(self._pointer, other._pointer)
-        _check_status(cairo.cairo_font_options_status(self._pointer))
+        _check_status(_cairo_font_options_status(self._pointer))
 
     def __hash__(self):
         return cairo.cairo_font_options_hash(self._pointer)
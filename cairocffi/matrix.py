@@ -86,9 +86,10 @@ class Matrix(object):
         return self.as_tuple() != other.as_tuple()
 
     def __repr__(self):
-        class_ = type(self)
-        return '%s(%g, %g, %g, %g, %g, %g)' % (
-            (class_.__name__,) + self.as_tuple())
+        ptr = self._pointer
+        return (
+            f'{type(self).__name__}({ptr.xx:g}, {ptr.yx:g}, {ptr.xy:g}, '
+            f'{ptr.yy:g}, {ptr.x0:g}, {ptr.y0:g})')
 
     def multiply(self, other):
         """Multiply with another matrix
@@ -235,6 +236,43 @@ class Matrix(object):
         cairo.cairo_matrix_transform_distance(self._pointer, xy + 0, xy + 1)
         return tuple(xy)
 
+    def as_array(self):
+        """Return the matrix’s components as a NumPy array.
+
+        This method requires NumPy.
+
+        :returns:
+            A ``(2, 3)`` array of floats,
+            ``[[xx, xy, x0], [yx, yy, y0]]``.
+
+        *New in cairocffi 1.5.*
+
+        """
+        import numpy
+        ptr = self._pointer
+        return numpy.array(
+            [[ptr.xx, ptr.xy, ptr.x0], [ptr.yx, ptr.yy, ptr.y0]])
+
+    def transform_points(self, points):
+        """Transforms many points at once by this matrix.
+
+        This is the same as calling :meth:`transform_point` for each point,
+        but the whole computation is done by NumPy, without calling cairo.
+        This method requires NumPy.
+
+        :param points:
+            A sequence of ``(x, y)`` points,
+            or any array-like object of shape ``(N, 2)``.
+        :returns: A ``(N, 2)`` array of floats.
+
+        *New in cairocffi 1.5.*
+
+        """
+        import numpy
+        points = numpy.asarray(points, dtype=numpy.float64)
+        matrix = self.as_array()
+        return points @ matrix[:, :2].T + matrix[:, 2]
+
     def _component_property(name):
         return property(
             lambda self: getattr(self._pointer, name),
@@ -13,6 +13,12 @@ from . import _check_status, _keepref, cairo, constants, ffi
 from .matrix import Matrix
 from .surfaces import Surface
 
+_cairo_pattern_add_color_stop_rgb = cairo.cairo_pattern_add_color_stop_rgb
+_cairo_pattern_add_color_stop_rgba = cairo.cairo_pattern_add_color_stop_rgba
+_cairo_pattern_get_color_stop_count = cairo.cairo_pattern_get_color_stop_count
+_cairo_pattern_get_color_stop_rgba = cairo.cairo_pattern_get_color_stop_rgba
+_cairo_pattern_status = cairo.cairo_pattern_status
+
 
 class Pattern(object):
     """The base class for all pattern types.
@@ -37,7 +43,7 @@ class Pattern(object):
         self._check_status()
 
     def _check_status(self):
-        _check_status(cairo.cairo_pattern_status(self._pointer))
+        _check_status(_cairo_pattern_status(self._pointer))
 
     @staticmethod
     def _from_pointer(pointer, incref):
@@ -250,7 +256,7 @@ class Gradient(Pattern):
         :type alpha: float
 
         """
-        cairo.cairo_pattern_add_color_stop_rgba(
+        _cairo_pattern_add_color_stop_rgba(
             self._pointer, offset, red, green, blue, alpha)
         self._check_status()
 
@@ -259,7 +265,7 @@ class Gradient(Pattern):
         Kept for compatibility with pycairo.
 
         """
-        cairo.cairo_pattern_add_color_stop_rgb(
+        _cairo_pattern_add_color_stop_rgb(
             self._pointer, offset, red, green, blue)
         self._check_status()
 
@@ -271,12 +277,12 @@ class Gradient(Pattern):
 
         """
         count = ffi.new('int *')
-        _check_status(cairo.cairo_pattern_get_color_stop_count(
+        _check_status(_cairo_pattern_get_color_stop_count(
             self._pointer, count))
         stops = []
         stop = ffi.new('double[5]')
         for i in range(count[0]):
-            _check_status(cairo.cairo_pattern_get_color_stop_rgba(
+            _check_status(_cairo_pattern_get_color_stop_rgba(
                 self._pointer, i,
                 stop + 0, stop + 1, stop + 2, stop + 3, stop + 4))
             stops.append(tuple(stop))
@@ -141,8 +141,9 @@ def pixbuf_to_cairo_gdk(pixbuf):
 
     """
     dummy_context = Context(ImageSurface(constants.FORMAT_ARGB32, 1, 1))
+    # The context pointer may come from the API-mode ffi, cast it to ours
     gdk.gdk_cairo_set_source_pixbuf(
-        dummy_context._pointer, pixbuf._pointer, 0, 0)
+        ffi.cast('cairo_t *', dummy_context._pointer), pixbuf._pointer, 0, 0)
     return dummy_context.get_source().get_surface()
 
 
@@ -9,13 +9,10 @@
 
 """
 
-import ctypes
 import io
-import operator
 import os
 import sys
 import weakref
-from functools import reduce
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 
@@ -23,6 +20,18 @@ from . import _check_status, _keepref, cairo, constants, ffi
 from .fonts import FontOptions, _encode_string
 
 SURFACE_TARGET_KEY = ffi.new('cairo_user_data_key_t *')
+_MEMORY_WRITER_KEY = ffi.new('cairo_user_data_key_t *')
+
+_cairo_format_stride_for_width = cairo.cairo_format_stride_for_width
+_cairo_image_surface_create = cairo.cairo_image_surface_create
+_cairo_image_surface_create_for_data = (
+    cairo.cairo_image_surface_create_for_data)
+_cairo_image_surface_get_data = cairo.cairo_image_surface_get_data
+_cairo_image_surface_get_format = cairo.cairo_image_surface_get_format
+_cairo_image_surface_get_height = cairo.cairo_image_surface_get_height
+_cairo_image_surface_get_stride = cairo.cairo_image_surface_get_stride
+_cairo_image_surface_get_width = cairo.cairo_image_surface_get_width
+_cairo_surface_status = cairo.cairo_surface_status
 
 
 def _make_read_func(file_obj):
@@ -49,6 +58,82 @@ def _make_write_func(file_obj):
     return write_func
 
 
+class _MemoryWriter(object):
+    """Collect the output of cairo in C memory,
+    and write it to a file-like object when :meth:`flush` is called.
+
+    cairo calls a C function for each write instead of a Python callback.
+    This is only available with the API-mode bindings,
+    see :attr:`available`.
+
+    """
+    available = hasattr(cairo, 'cairocffi_buffer_write')
+    instances = set()
+
+    def __init__(self, file_obj):
+        self.file_obj = file_obj
+        self.write_func = ffi.addressof(cairo, 'cairocffi_buffer_write')
+        self.closure = ffi.gc(
+            ffi.new('cairocffi_buffer_t *'), cairo.cairocffi_buffer_free)
+
+    def flush(self):
+        """Write the collected output to the file-like object."""
+        buffer = self.closure
+        if buffer.length:
+            self.file_obj.write(ffi.buffer(buffer.data, buffer.length))
+            buffer.length = 0
+
+    def attach(self, pointer):
+        """Keep this writer alive until the surface is destroyed.
+
+        The writer is stored in the surface’s user data, so that
+        it can be found by :func:`_flush_memory_writer` from any
+        :class:`Surface` wrapping the same pointer.
+        The remaining output is written when the surface is destroyed.
+
+        """
+        self.handle = ffi.new_handle(self)
+        self.destroy_func = ffi.callback(
+            'cairo_destroy_func_t', _destroy_memory_writer)
+        _check_status(cairo.cairo_surface_set_user_data(
+            pointer, _MEMORY_WRITER_KEY, self.handle, self.destroy_func))
+        self.instances.add(self)
+
+
+def _destroy_memory_writer(handle):
+    # cairo finishes the surface before destroying its user data,
+    # all the output is collected at this point.
+    writer = ffi.from_handle(handle)
+    writer.flush()
+    writer.instances.remove(writer)
+
+
+def _flush_memory_writer(pointer):
+    """Write the output collected for a :c:type:`cairo_surface_t *`,
+    if it writes to a :class:`_MemoryWriter`.
+
+    """
+    if _MemoryWriter.available:
+        handle = cairo.cairo_surface_get_user_data(
+            pointer, _MEMORY_WRITER_KEY)
+        if handle != ffi.NULL:
+            ffi.from_handle(handle).flush()
+
+
+def _make_write_stream(file_obj):
+    """Return a ``(write_func, closure, target_keep_alive)`` tuple,
+    to create a surface or write a PNG image to a file-like object.
+
+    :class:`io.BytesIO` objects get a :class:`_MemoryWriter` when possible.
+
+    """
+    if _MemoryWriter.available and isinstance(file_obj, io.BytesIO):
+        writer = _MemoryWriter(file_obj)
+        return writer.write_func, writer.closure, writer
+    write_func = _make_write_func(file_obj)
+    return write_func, ffi.NULL, write_func
+
+
 def _encode_filename(filename):  # pragma: no cover
     """Return a byte string suitable for a filename.
 
@@ -74,25 +159,6 @@ def _encode_filename(filename):  # pragma: no cover
     return ffi.new('char[]', filename)
 
 
-def from_buffer(obj):
-    """Return ``(pointer_address, length_in_bytes)`` for a buffer object."""
-    if hasattr(obj, 'buffer_info'):
-        # Looks like a array.array object.
-        address, length = obj.buffer_info()
-        return address, length * obj.itemsize
-    elif hasattr(obj, '__array_interface__'):
-        # Looks like a numpy.ndarray object
-        length = reduce(operator.mul, obj.shape)
-        return ctypes.addressof(ctypes.c_char.from_buffer(obj)), length
-    else:
-        # Other buffers.
-        # XXX Unfortunately ctypes.c_char.from_buffer
-        # does not have length information,
-        # and we’re not sure that len(obj) is measured in bytes.
-        # (It’s not for array.array, though that is taken care of.)
-        return ctypes.addressof(ctypes.c_char.from_buffer(obj)), len(obj)
-
-
 class KeepAlive(object):
     """
     Keep some objects alive until a callback is called.
@@ -156,18 +222,16 @@ class Surface(object):
         self._pointer = ffi.gc(
             pointer, _keepref(cairo, cairo.cairo_surface_destroy))
         self._check_status()
-        if hasattr(target_keep_alive, '__array_interface__'):
-            is_empty = target_keep_alive.size == 0
-        else:
-            is_empty = target_keep_alive in (None, ffi.NULL)
-        if not is_empty:
+        if isinstance(target_keep_alive, _MemoryWriter):
+            target_keep_alive.attach(self._pointer)
+        elif target_keep_alive not in (None, ffi.NULL):
             keep_alive = KeepAlive(target_keep_alive)
             _check_status(cairo.cairo_surface_set_user_data(
                 self._pointer, SURFACE_TARGET_KEY, *keep_alive.closure))
             keep_alive.save()
 
     def _check_status(self):
-        _check_status(cairo.cairo_surface_status(self._pointer))
+        _check_status(_cairo_surface_status(self._pointer))
 
     @staticmethod
     def _from_pointer(pointer, incref):
@@ -592,6 +656,7 @@ class Surface(object):
         """
         cairo.cairo_surface_show_page(self._pointer)
         self._check_status()
+        _flush_memory_writer(self._pointer)
 
     def copy_page(self):
         """Emits the current page for backends that support multiple pages,
@@ -605,6 +670,7 @@ class Surface(object):
         """
         cairo.cairo_surface_copy_page(self._pointer)
         self._check_status()
+        _flush_memory_writer(self._pointer)
 
     def flush(self):
         """Do any pending drawing for the surface
@@ -619,6 +685,7 @@ class Surface(object):
         """
         cairo.cairo_surface_flush(self._pointer)
         self._check_status()
+        _flush_memory_writer(self._pointer)
 
     def finish(self):
         """This method finishes the surface
@@ -638,6 +705,7 @@ class Surface(object):
         """
         cairo.cairo_surface_finish(self._pointer)
         self._check_status()
+        _flush_memory_writer(self._pointer)
 
     def write_to_png(self, target=None):
         """Writes the contents of surface as a PNG image.
@@ -656,9 +724,11 @@ class Surface(object):
             target = io.BytesIO()
         if hasattr(target, 'write'):
             try:
-                write_func = _make_write_func(target)
+                write_func, closure, keep_alive = _make_write_stream(target)
                 _check_status(cairo.cairo_surface_write_to_png_stream(
-                    self._pointer, write_func, ffi.NULL))
+                    self._pointer, write_func, closure))
+                if isinstance(keep_alive, _MemoryWriter):
+                    keep_alive.flush()
             except SystemError:  # noqa
                 # Callback creation has failed
                 if hasattr(target, 'name'):
@@ -690,10 +760,6 @@ class ImageSurface(Surface):
     using, for example, :meth:`Context.rectangle` and :meth:`Context.fill`
     if you want it cleared.
 
-    .. note::
-
-        Currently only :class:`array.array` buffers are supported on PyPy.
-
     Otherwise, the surface contents are all initially 0.
     (Specifically, within each pixel, each color or alpha channel
     belonging to format will be 0.
@@ -704,8 +770,11 @@ class ImageSurface(Surface):
     :param width: Width of the surface, in pixels.
     :param height: Height of the surface, in pixels.
     :param data:
-        Buffer supplied in which to write contents,
+        Writable buffer supplied in which to write contents,
         or :obj:`None` to create a new buffer.
+        Any object supporting the buffer protocol can be used,
+        such as :class:`bytearray`, :class:`array.array`
+        or :class:`numpy.ndarray`. It is used directly, without copy.
     :param stride:
         The number of bytes between the start of rows
         in the buffer as allocated.
@@ -717,21 +786,32 @@ class ImageSurface(Surface):
     :type width: int
     :type height: int
     :type stride: int
+    :raises:
+        :exc:`ValueError` if :obj:`stride` is smaller
+        than the value given by :meth:`format_stride_for_width`,
+        or if :obj:`data` is too small for this stride and height.
 
     """
     def __init__(self, format, width, height, data=None, stride=None):
         if data is None:
-            pointer = cairo.cairo_image_surface_create(format, width, height)
+            pointer = _cairo_image_surface_create(format, width, height)
         else:
+            min_stride = self.format_stride_for_width(format, width)
             if stride is None:
-                stride = self.format_stride_for_width(format, width)
-            address, length = from_buffer(data)
-            if length < stride * height:
+                stride = min_stride
+            elif stride < min_stride:
+                # Also catches negative strides, that would make cairo
+                # write before the beginning of the buffer.
+                raise ValueError('Got a stride of %d, needs at least %d.'
+                                 % (stride, min_stride))
+            # Point to the buffer’s memory, the cdata keeps it alive
+            data = ffi.from_buffer(
+                'unsigned char[]', data, require_writable=True)
+            if len(data) < stride * height:
                 raise ValueError('Got a %d bytes buffer, needs at least %d.'
-                                 % (length, stride * height))
-            pointer = cairo.cairo_image_surface_create_for_data(
-                ffi.cast('unsigned char*', address), format, width, height,
-                stride)
+                                 % (len(data), stride * height))
+            pointer = _cairo_image_surface_create_for_data(
+                data, format, width, height, stride)
         Surface.__init__(self, pointer, target_keep_alive=data)
 
     @classmethod
@@ -764,7 +844,7 @@ class ImageSurface(Surface):
             or -1 if either the format is invalid or the width too large.
 
         """
-        return cairo.cairo_format_stride_for_width(format, width)
+        return _cairo_format_stride_for_width(format, width)
 
     @classmethod
     def create_from_png(cls, source):
@@ -798,24 +878,53 @@ class ImageSurface(Surface):
         A call to :meth:`~Surface.mark_dirty` is required
         after the data is modified.
 
-        :returns: A read-write CFFI buffer object.
+        :returns:
+            A read-write :class:`memoryview` of bytes,
+            sharing its memory with the surface and keeping it alive.
+            Slices are views too, use :meth:`~memoryview.tobytes`
+            to get a copy of the pixel data.
+
+        *Changed in cairocffi 1.5:*
+        Return a :class:`memoryview` instead of a CFFI buffer.
+        ``get_data()[:]`` is now a view, not a :class:`bytes` copy.
+
+        """
+        # Keep the surface alive as long as its data is referenced
+        pointer = ffi.gc(
+            _cairo_image_surface_get_data(self._pointer),
+            _keepref(self, lambda pointer: None))
+        return memoryview(
+            ffi.buffer(pointer, self.get_stride() * self.get_height()))
+
+    def clear(self):
+        """Set all the pixel data of the surface to zero bytes,
+        giving transparent black pixels.
+
+        The data is cleared in place with a single ``memset``,
+        without drawing with cairo.
+        Pending drawing operations are flushed first,
+        and the surface is marked as dirty afterwards.
+
+        *New in cairocffi 1.5.*
 
         """
-        return ffi.buffer(
-            cairo.cairo_image_surface_get_data(self._pointer),
-            self.get_stride() * self.get_height())
+        self.flush()
+        pointer = _cairo_image_surface_get_data(self._pointer)
+        if pointer != ffi.NULL:
+            ffi.memset(pointer, 0, self.get_stride() * self.get_height())
+        self.mark_dirty()
 
     def get_format(self):
         """Return the :ref:`FORMAT` string of the surface."""
-        return cairo.cairo_image_surface_get_format(self._pointer)
+        return _cairo_image_surface_get_format(self._pointer)
 
     def get_width(self):
         """Return the width of the surface, in pixels."""
-        return cairo.cairo_image_surface_get_width(self._pointer)
+        return _cairo_image_surface_get_width(self._pointer)
 
     def get_height(self):
         """Return the width of the surface, in pixels."""
-        return cairo.cairo_image_surface_get_height(self._pointer)
+        return _cairo_image_surface_get_height(self._pointer)
 
     def get_stride(self):
         """Return the stride of the image surface in bytes
@@ -826,7 +935,7 @@ class ImageSurface(Surface):
         to the beginning of the next row.
 
         """
-        return cairo.cairo_image_surface_get_stride(self._pointer)
+        return _cairo_image_surface_get_stride(self._pointer)
 
 
 class PDFSurface(Surface):
@@ -866,14 +975,14 @@ class PDFSurface(Surface):
     """
     def __init__(self, target, width_in_points, height_in_points):
         if hasattr(target, 'write') or target is None:
-            write_func = _make_write_func(target)
+            write_func, closure, keep_alive = _make_write_stream(target)
             pointer = cairo.cairo_pdf_surface_create_for_stream(
-                write_func, ffi.NULL, width_in_points, height_in_points)
+                write_func, closure, width_in_points, height_in_points)
         else:
-            write_func = None
+            keep_alive = None
             pointer = cairo.cairo_pdf_surface_create(
                 _encode_filename(target), width_in_points, height_in_points)
-        Surface.__init__(self, pointer, target_keep_alive=write_func)
+        Surface.__init__(self, pointer, target_keep_alive=keep_alive)
 
     def set_size(self, width_in_points, height_in_points):
         """Changes the size of a PDF surface
@@ -1063,14 +1172,14 @@ class PSSurface(Surface):
     """
     def __init__(self, target, width_in_points, height_in_points):
         if hasattr(target, 'write') or target is None:
-            write_func = _make_write_func(target)
+            write_func, closure, keep_alive = _make_write_stream(target)
             pointer = cairo.cairo_ps_surface_create_for_stream(
-                write_func, ffi.NULL, width_in_points, height_in_points)
+                write_func, closure, width_in_points, height_in_points)
         else:
-            write_func = None
+            keep_alive = None
             pointer = cairo.cairo_ps_surface_create(
                 _encode_filename(target), width_in_points, height_in_points)
-        Surface.__init__(self, pointer, target_keep_alive=write_func)
+        Surface.__init__(self, pointer, target_keep_alive=keep_alive)
 
     def dsc_comment(self, comment):
         """ Emit a comment into the PostScript output for the given surface.
@@ -1308,14 +1417,14 @@ class SVGSurface(Surface):
     """
     def __init__(self, target, width_in_points, height_in_points):
         if hasattr(target, 'write') or target is None:
-            write_func = _make_write_func(target)
+            write_func, closure, keep_alive = _make_write_stream(target)
             pointer = cairo.cairo_svg_surface_create_for_stream(
-                write_func, ffi.NULL, width_in_points, height_in_points)
+                write_func, closure, width_in_points, height_in_points)
         else:
-            write_func = None
+            keep_alive = None
             pointer = cairo.cairo_svg_surface_create(
                 _encode_filename(target), width_in_points, height_in_points)
-        Surface.__init__(self, pointer, target_keep_alive=write_func)
+        Surface.__init__(self, pointer, target_keep_alive=keep_alive)
 
     def restrict_to_version(self, version):
         """Restricts the generated SVG file to :obj:`version`.
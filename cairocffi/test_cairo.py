@@ -17,11 +17,12 @@ import io
 import math
 import os
 import shutil
+import struct
 import sys
 import tempfile
 
 import cairocffi
-import pikepdf
+import numpy
 import pytest
 
 from . import (
@@ -30,23 +31,40 @@ from . import (
     PDF_METADATA_TITLE, PDF_OUTLINE_FLAG_BOLD, PDF_OUTLINE_FLAG_OPEN,
     PDF_OUTLINE_ROOT, SVG_UNIT_PC, SVG_UNIT_PT, SVG_UNIT_PX, SVG_UNIT_USER,
     TAG_LINK, Context, FontFace, FontOptions, ImageSurface, LinearGradient,
-    Matrix, Pattern, PDFSurface, PSSurface, RadialGradient, RecordingSurface,
-    ScaledFont, SolidPattern, Surface, SurfacePattern, SVGSurface, ToyFontFace,
-    cairo_version, cairo_version_string)
+    Matrix, PathData, Pattern, PDFSurface, PSSurface, RadialGradient,
+    RecordingSurface, ScaledFont, SolidPattern, Surface, SurfacePattern,
+    SVGSurface, ToyFontFace, cairo_version, cairo_version_string)
+from ._flatten import flatten_cubic
 
-if sys.byteorder == 'little':
-    def pixel(argb):  # pragma: no cover
-        """Convert a 4-byte ARGB string to native-endian."""
-        return argb[::-1]
-else:
-    def pixel(argb):  # pragma: no cover
-        """Convert a 4-byte ARGB string to native-endian."""
-        return argb
+
+class PixelTable(dict):
+    """Native-endian ARGB32 pixels, keyed by their ARGB bytes.
+
+    Each pixel is converted on first use, later lookups are dict hits.
+
+    """
+    def __missing__(self, argb):
+        pixel = self[argb] = struct.pack('=I', int.from_bytes(argb, 'big'))
+        return pixel
+
+
+PIXEL = PixelTable()
+
+# 1×1 PNG image holding a single PIXEL[b'\xCC\x32\x6E\x97']
+PNG_BYTES = base64.b64decode(
+    b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVQI12O'
+    b'w69x7BgAE3gJRgNit0AAAAABJRU5ErkJggg==')
+
+
+# Invalid values for version_to_string() methods, with the expected errors
+INVALID_VERSIONS = [('VERSION_42', TypeError), (42, ValueError)]
 
 
 @contextlib.contextmanager
 def temp_directory():
-    tempdir = tempfile.mkdtemp('é')
+    # Use a memory-backed file system when available
+    tempdir = tempfile.mkdtemp(
+        'é', dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
     assert 'é' in tempdir  # Test non-ASCII filenames
     try:
         yield tempdir
@@ -54,19 +72,138 @@ def temp_directory():
         shutil.rmtree(tempdir)
 
 
+@pytest.fixture(params=['filename', 'filename_bytes', 'file_obj', None])
+def output_target(request):
+    """Yield each kind of surface target, with a function reading it.
+
+    The function returns the bytes written to the target,
+    or :obj:`None` when the target is :obj:`None`.
+
+    """
+    if request.param is None:
+        yield None, lambda: None
+    elif request.param == 'file_obj':
+        file_obj = io.BytesIO()
+        yield file_obj, file_obj.getvalue
+    else:
+        with temp_directory() as tempdir:
+            filename = os.path.join(tempdir, 'foo')
+            # Existing files are overwritten
+            with open(filename, 'wb') as fd:
+                fd.write(b'garbage')
+
+            def read():
+                with open(filename, 'rb') as fd:
+                    return fd.read()
+
+            if request.param == 'filename_bytes':
+                yield filename.encode(sys.getfilesystemencoding()), read
+            else:
+                yield filename, read
+
+
+@pytest.fixture(scope='session')
+def pikepdf():
+    """The pikepdf module, only imported by tests reading PDF files."""
+    import pikepdf
+    return pikepdf
+
+
+@pytest.fixture(scope='module')
+def throwaway_pdf():
+    """Shared PDF surface without output, for tests not modifying it."""
+    return PDFSurface(None, 1, 1)
+
+
+@pytest.fixture(scope='module')
+def a8_surface():
+    """Shared 4×4 A8 surface, to be cleared by the tests using it."""
+    surface = ImageSurface(cairocffi.FORMAT_A8, 4, 4)
+    yield surface
+    surface.finish()
+
+
 def round_tuple(values):
-    return tuple(round(v, 6) for v in values)
+    return tuple(numpy.round(values, 6).tolist())
+
+
+def assert_all_argb(data, argb, count):
+    """Assert that data holds count ARGB32 pixels, all equal to argb.
+
+    ARGB32 pixels are native-endian 32-bit words,
+    compared here with a uint32 view of the data.
+
+    """
+    assert numpy.array_equal(
+        numpy.frombuffer(data, dtype=numpy.uint32),
+        numpy.full(count, argb, dtype=numpy.uint32))
+
+
+def as_array(surface):
+    """Return a NumPy view of the pixels of an image surface.
+
+    The array has a ``(height, width)`` shape, with native-endian
+    32-bit words for ARGB32 and RGB24 pixels and bytes for A8 pixels.
+
+    """
+    dtype = {
+        cairocffi.FORMAT_ARGB32: numpy.uint32,
+        cairocffi.FORMAT_RGB24: numpy.uint32,
+        cairocffi.FORMAT_A8: numpy.uint8,
+    }[surface.get_format()]
+    data = numpy.frombuffer(surface.get_data(), dtype=dtype)
+    return data.reshape(surface.get_height(), -1)[:, :surface.get_width()]
+
+
+def assert_surface_data(surface, expected):
+    """Assert that the data of an image surface is equal to expected.
+
+    Data is compared with a single memcmp, and the first difference is
+    reported with some context on failure.
+
+    """
+    data = surface.get_data().tobytes()
+    if data != expected:
+        offset = next((
+            i for i, (byte, expected_byte) in enumerate(zip(data, expected))
+            if byte != expected_byte), min(len(data), len(expected)))
+        raise AssertionError('Data differs at offset %d: %r != %r' % (
+            offset, data[offset:offset + 16], expected[offset:offset + 16]))
+
+
+def max_curve_distance(curve, points):
+    """Return the distance between a sampled cubic curve and a polyline."""
+    t = numpy.linspace(0, 1, 2001)[:, None]
+    p0, p1, p2, p3 = numpy.asarray(curve, dtype=numpy.float64)
+    samples = (
+        (1 - t) ** 3 * p0 + 3 * (1 - t) ** 2 * t * p1 +
+        3 * (1 - t) * t ** 2 * p2 + t ** 3 * p3)
+    points = numpy.asarray(points, dtype=numpy.float64)
+    starts, vectors = points[:-1], points[1:] - points[:-1]
+    relative = samples[:, None, :] - starts[None, :, :]
+    lengths = (vectors ** 2).sum(axis=1)
+    projections = numpy.clip(
+        (relative * vectors).sum(axis=2) / numpy.where(lengths, lengths, 1),
+        0, 1)
+    distances = numpy.linalg.norm(
+        relative - projections[:, :, None] * vectors, axis=2)
+    return distances.min(axis=1).max()
 
 
 def assert_raise_finished(func, *args, **kwargs):
-    with pytest.raises(cairocffi.CairoError) as exc:
+    try:
         func(*args, **kwargs)
-    assert 'SURFACE_FINISHED' in str(exc) or 'ExceptionInfo' in str(exc)
+    except cairocffi.CairoError as exception:
+        if 'SURFACE_FINISHED' in str(exception):
+            return
+        raise
+    raise AssertionError('Expected CairoError with SURFACE_FINISHED')
 
 
 def test_cairo_version():
     major, minor, micro = map(int, cairo_version_string().split('.'))
     assert cairo_version() == major * 10000 + minor * 100 + micro
+    assert cairo_version_string() is cairo_version_string()
 
 
 def test_install_as_pycairo():
@@ -86,31 +223,37 @@ def test_image_surface():
     assert surface.get_width() == 20
     assert surface.get_height() == 30
     assert surface.get_stride() == 20 * 4
+    data = surface.get_data()
+    assert isinstance(data, memoryview)
+    assert data.nbytes == 20 * 4 * 30
+    del surface  # The data keeps the surface alive
+    assert data == b'\x00' * 20 * 4 * 30
 
     with pytest.raises(ValueError):
         # buffer too small
-        data = array.array('B', b'\x00' * 799)
+        data = numpy.zeros(799, dtype=numpy.uint8)
         ImageSurface.create_for_data(data, cairocffi.FORMAT_ARGB32, 10, 20)
-    data = array.array('B', b'\x00' * 800)
+    with pytest.raises(ValueError):
+        # stride too small
+        data = numpy.zeros(800, dtype=numpy.uint8)
+        ImageSurface.create_for_data(
+            data, cairocffi.FORMAT_ARGB32, 10, 20, stride=36)
+    data = numpy.zeros(800, dtype=numpy.uint8)
     surface = ImageSurface.create_for_data(data, cairocffi.FORMAT_ARGB32,
                                            10, 20, stride=40)
     context = Context(surface)
     # The default source is opaque black:
     assert context.get_source().get_rgba() == (0, 0, 0, 1)
     context.paint_with_alpha(0.5)
-    assert data.tobytes() == pixel(b'\x80\x00\x00\x00') * 200
+    assert_all_argb(data, 0x80000000, 200)
 
 
 def test_image_bytearray_buffer():
-    if '__pypy__' in sys.modules:
-        pytest.xfail()
-    # Also test buffers through ctypes.c_char.from_buffer,
-    # not available on PyPy
     data = bytearray(800)
     surface = ImageSurface.create_for_data(data, cairocffi.FORMAT_ARGB32,
                                            10, 20, stride=40)
     Context(surface).paint_with_alpha(0.5)
-    assert data == pixel(b'\x80\x00\x00\x00') * 200
+    assert_all_argb(data, 0x80000000, 200)
 
 
 @pytest.mark.xfail(cairo_version() < 11200,
@@ -130,16 +273,16 @@ def test_surface_create_similar_image():
 def test_surface_create_for_rectangle():
     surface = ImageSurface(cairocffi.FORMAT_A8, 4, 4)
     data = surface.get_data()
-    assert data[:] == b'\x00' * 16
+    assert data.tobytes() == b'\x00' * 16
     Context(surface.create_for_rectangle(1, 1, 2, 2)).paint()
-    assert data[:] == (
+    assert data.tobytes() == (
         b'\x00\x00\x00\x00'
         b'\x00\xFF\xFF\x00'
         b'\x00\xFF\xFF\x00'
         b'\x00\x00\x00\x00')
 
 
-def test_surface():
+def test_surface(throwaway_pdf):
     surface = ImageSurface(cairocffi.FORMAT_ARGB32, 20, 30)
     similar = surface.create_similar(cairocffi.CONTENT_ALPHA, 4, 100)
     assert isinstance(similar, ImageSurface)
@@ -148,7 +291,7 @@ def test_surface():
     assert similar.get_width() == 4
     assert similar.get_height() == 100
     assert similar.has_show_text_glyphs() is False
-    assert PDFSurface(None, 1, 1).has_show_text_glyphs() is True
+    assert throwaway_pdf.has_show_text_glyphs() is True
     surface.copy_page()
     surface.show_page()
     surface.mark_dirty()
@@ -186,16 +329,21 @@ def test_target_lifetime():
     if not hasattr(sys, 'getrefcount'):
         pytest.xfail()  # PyPy
     gc.collect()  # Clean up stuff from other tests
+    # With the API-mode bindings, BytesIO targets are kept by memory writers
+    if cairocffi.surfaces._MemoryWriter.available:
+        instances = cairocffi.surfaces._MemoryWriter.instances
+    else:
+        instances = cairocffi.surfaces.KeepAlive.instances
     target = io.BytesIO()
     initial_refcount = sys.getrefcount(target)
-    assert len(cairocffi.surfaces.KeepAlive.instances) == 0
+    assert len(instances) == 0
     surface = PDFSurface(target, 100, 100)
-    # The target is in a KeepAlive object
-    assert len(cairocffi.surfaces.KeepAlive.instances) == 1
+    # The target is in a KeepAlive object or in a memory writer
+    assert len(instances) == 1
     assert sys.getrefcount(target) == initial_refcount + 1
     del surface
     gc.collect()  # Make sure surface is collected
-    assert len(cairocffi.surfaces.KeepAlive.instances) == 0
+    assert len(instances) == 0
     assert sys.getrefcount(target) == initial_refcount
 
 
@@ -221,9 +369,9 @@ def test_mime_data():
 
 @pytest.mark.xfail(cairo_version() < 11200,
                    reason='Cairo version too low')
-def test_supports_mime_type():
+def test_supports_mime_type(throwaway_pdf):
     # Also test we get actual booleans:
-    assert PDFSurface(None, 1, 1).supports_mime_type('image/jpeg') is True
+    assert throwaway_pdf.supports_mime_type('image/jpeg') is True
     surface = ImageSurface(cairocffi.FORMAT_A8, 1, 1)
     assert surface.supports_mime_type('image/jpeg') is False
 
@@ -239,7 +387,7 @@ def test_device_scale():
 
 @pytest.mark.xfail(cairo_version() < 11504,
                    reason='Cairo version too low')
-def test_metadata():
+def test_metadata(pikepdf):
     file_obj = io.BytesIO()
     surface = PDFSurface(file_obj, 1, 1)
     surface.set_metadata(PDF_METADATA_TITLE, 'title')
@@ -264,7 +412,7 @@ def test_metadata():
 
 @pytest.mark.xfail(cairo_version() < 11504,
                    reason='Cairo version too low')
-def test_outline():
+def test_outline(pikepdf):
     file_obj = io.BytesIO()
     surface = PDFSurface(file_obj, 1, 1)
     outline = surface.add_outline(
@@ -280,7 +428,7 @@ def test_outline():
 
 @pytest.mark.xfail(cairo_version() < 11504,
                    reason='Cairo version too low')
-def test_page_label():
+def test_page_label(pikepdf):
     file_obj = io.BytesIO()
     surface = PDFSurface(file_obj, 1, 1)
     surface.set_page_label('abc')
@@ -291,7 +439,7 @@ def test_page_label():
 
 @pytest.mark.xfail(cairo_version() < 11504,
                    reason='Cairo version too low')
-def test_tag():
+def test_tag(pikepdf):
     file_obj = io.BytesIO()
     surface = PDFSurface(file_obj, 10, 10)
     context = Context(surface)
@@ -307,8 +455,9 @@ def test_tag():
     context.show_page()
     surface.finish()
     pdf = pikepdf.Pdf.open(file_obj)
-    assert '"/URI": "https://cairocffi.readthedocs.io/"' in str(pdf.objects)
-    assert '"/S": "/Document"' in str(pdf.objects)
+    link, = pdf.pages[0]['/Annots']
+    assert str(link['/A']['/URI']) == 'https://cairocffi.readthedocs.io/'
+    assert pdf.Root['/StructTreeRoot']['/K'][0]['/S'] == '/Document'
 
 
 @pytest.mark.xfail(cairo_version() < 11504,
@@ -318,15 +467,15 @@ def test_thumbnail_size():
     surface = PDFSurface(file_obj, 1, 1)
     surface.set_thumbnail_size(1, 1)
     surface.finish()
-    pdf_bytes1 = file_obj.getvalue()
+    pdf_size1 = file_obj.getbuffer().nbytes
 
     file_obj = io.BytesIO()
     surface = PDFSurface(file_obj, 1, 1)
     surface.set_thumbnail_size(9, 9)
     surface.finish()
-    pdf_bytes2 = file_obj.getvalue()
+    pdf_size2 = file_obj.getbuffer().nbytes
 
-    assert len(pdf_bytes1) < len(pdf_bytes2)
+    assert pdf_size1 < pdf_size2
 
 
 @pytest.mark.xfail(cairo_version() < 11510,
@@ -354,47 +503,44 @@ def test_document_unit():
     assert b'height="2pc"' in pdf_bytes
 
 
-def test_png():
-    png_bytes = base64.b64decode(
-        b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVQI12O'
-        b'w69x7BgAE3gJRgNit0AAAAABJRU5ErkJggg==')
-    png_magic_number = png_bytes[:8]
-
+def test_png_write(output_target):
+    target, read_output = output_target
+    surface = ImageSurface(cairocffi.FORMAT_ARGB32, 1, 1)
+    png_bytes = surface.write_to_png(target)
+    if target is None:
+        assert isinstance(png_bytes, bytes)
+    else:
+        assert png_bytes is None
+        png_bytes = read_output()
+    assert png_bytes[:8] == PNG_BYTES[:8]
+    surface = ImageSurface.create_from_png(io.BytesIO(png_bytes))
+    assert_surface_data(surface, PIXEL[b'\x00\x00\x00\x00'])
+
+
+@pytest.mark.parametrize('source', ['filename', 'filename_bytes', 'file_obj'])
+def test_png_read(source):
     with temp_directory() as tempdir:
         filename = os.path.join(tempdir, 'foo.png')
-        filename_bytes = filename.encode(sys.getfilesystemencoding())
-
-        surface = ImageSurface(cairocffi.FORMAT_ARGB32, 1, 1)
-        surface.write_to_png(filename)
-        with open(filename, 'rb') as fd:
-            written_png_bytes = fd.read()
-            assert written_png_bytes.startswith(png_magic_number)
-        open(filename, 'wb').close()
-        with open(filename, 'rb') as fd:
-            assert fd.read() == b''
-        surface.write_to_png(filename_bytes)
-        with open(filename, 'rb') as fd:
-            assert fd.read() == written_png_bytes
-        file_obj = io.BytesIO()
-        surface.write_to_png(file_obj)
-        assert file_obj.getvalue() == written_png_bytes
-        assert surface.write_to_png() == written_png_bytes
-
         with open(filename, 'wb') as fd:
-            fd.write(png_bytes)
-        for source in [io.BytesIO(png_bytes), filename, filename_bytes]:
-            surface = ImageSurface.create_from_png(source)
-            assert surface.get_format() == cairocffi.FORMAT_ARGB32
-            assert surface.get_width() == 1
-            assert surface.get_height() == 1
-            assert surface.get_stride() == 4
-            assert surface.get_data()[:] == pixel(b'\xcc\x32\x6e\x97')
-
+            fd.write(PNG_BYTES)
+        surface = ImageSurface.create_from_png({
+            'filename': filename,
+            'filename_bytes': filename.encode(sys.getfilesystemencoding()),
+            'file_obj': io.BytesIO(PNG_BYTES),
+        }[source])
+        assert surface.get_format() == cairocffi.FORMAT_ARGB32
+        assert surface.get_width() == 1
+        assert surface.get_height() == 1
+        assert surface.get_stride() == 4
+        assert_surface_data(surface, PIXEL[b'\xCC\x32\x6E\x97'])
+
+
+def test_png_invalid():
     with pytest.raises(IOError):
         # Truncated input
-        surface = ImageSurface.create_from_png(io.BytesIO(png_bytes[:30]))
+        ImageSurface.create_from_png(io.BytesIO(PNG_BYTES[:30]))
     with pytest.raises(IOError):
-        surface = ImageSurface.create_from_png(io.BytesIO(b''))
+        ImageSurface.create_from_png(io.BytesIO(b''))
 
 
 @pytest.mark.xfail(cairo_version() < 11000,
@@ -403,38 +549,30 @@ def test_pdf_versions():
     assert set(PDFSurface.get_versions()) >= set([
         cairocffi.PDF_VERSION_1_4, cairocffi.PDF_VERSION_1_5])
     assert PDFSurface.version_to_string(cairocffi.PDF_VERSION_1_4) == 'PDF 1.4'
-    with pytest.raises(TypeError):
-        PDFSurface.version_to_string('PDF_VERSION_42')
-    with pytest.raises(ValueError):
-        PDFSurface.version_to_string(42)
 
     file_obj = io.BytesIO()
     PDFSurface(file_obj, 1, 1).finish()
-    assert file_obj.getvalue().startswith((b'%PDF-1.5', b'%PDF-1.7'))
+    assert file_obj.getbuffer()[:8] in (b'%PDF-1.5', b'%PDF-1.7')
 
     file_obj = io.BytesIO()
     surface = PDFSurface(file_obj, 1, 1)
     surface.restrict_to_version(cairocffi.PDF_VERSION_1_4)
     surface.finish()
-    assert file_obj.getvalue().startswith(b'%PDF-1.4')
+    assert file_obj.getbuffer()[:8] == b'%PDF-1.4'
 
 
-def test_pdf_surface():
-    with temp_directory() as tempdir:
-        filename = os.path.join(tempdir, 'foo.pdf')
-        filename_bytes = filename.encode(sys.getfilesystemencoding())
-        file_obj = io.BytesIO()
-        for target in [filename, filename_bytes, file_obj, None]:
-            surface = PDFSurface(target, 123, 432)
-            surface.finish()
-        with open(filename, 'rb') as fd:
-            assert fd.read().startswith(b'%PDF')
-        with open(filename_bytes, 'rb') as fd:
-            assert fd.read().startswith(b'%PDF')
-        pdf = pikepdf.Pdf.open(file_obj)
+def test_pdf_surface_target(output_target, pikepdf):
+    target, read_output = output_target
+    PDFSurface(target, 123, 432).finish()
+    if target is not None:
+        pdf_bytes = read_output()
+        assert pdf_bytes.startswith(b'%PDF')
+        pdf = pikepdf.Pdf.open(io.BytesIO(pdf_bytes))
         assert pdf.pages[0]['/MediaBox'] == [0, 0, 123, 432]
         assert len(pdf.pages) == 1
 
+
+def test_pdf_surface(pikepdf):
     file_obj = io.BytesIO()
     surface = PDFSurface(file_obj, 1, 1)
     context = Context(surface)
@@ -444,60 +582,57 @@ def test_pdf_surface():
     context.copy_page()
     surface.finish()
     pdf = pikepdf.Pdf.open(file_obj)
-    assert '"/MediaBox": [ 0 0 1 1 ]' not in str(pdf.objects)
+    media_boxes = [
+        pdf_object['/MediaBox'] for pdf_object in pdf.objects
+        if isinstance(pdf_object, pikepdf.Dictionary) and
+        '/MediaBox' in pdf_object]
+    assert [0, 0, 1, 1] not in media_boxes
     assert pdf.pages[0]['/MediaBox'] == [0, 0, 12, 100]
     assert pdf.pages[1]['/MediaBox'] == [0, 0, 42, 700]
     assert len(pdf.pages) == 2
 
 
+def test_pdf_surface_output():
+    # Output is written on each page and by any wrapper of the surface
+    file_obj = io.BytesIO()
+    context = Context(PDFSurface(file_obj, 1, 1))
+    context.show_page()
+    assert file_obj.getbuffer()[:4] == b'%PDF'
+    context.get_target().finish()
+    assert file_obj.getvalue().rstrip().endswith(b'%%EOF')
+
+    # Remaining output is written when the surface is destroyed
+    file_obj = io.BytesIO()
+    context = Context(PDFSurface(file_obj, 1, 1))
+    context.show_page()
+    del context
+    gc.collect()  # Make sure surface is collected
+    assert file_obj.getvalue().rstrip().endswith(b'%%EOF')
+
+
 def test_svg_surface():
     assert set(SVGSurface.get_versions()) >= set([
         cairocffi.SVG_VERSION_1_1, cairocffi.SVG_VERSION_1_2])
     assert SVGSurface.version_to_string(cairocffi.SVG_VERSION_1_1) == 'SVG 1.1'
-    with pytest.raises(TypeError):
-        SVGSurface.version_to_string('SVG_VERSION_42')
-    with pytest.raises(ValueError):
-        SVGSurface.version_to_string(42)
-
-    with temp_directory() as tempdir:
-        filename = os.path.join(tempdir, 'foo.svg')
-        filename_bytes = filename.encode(sys.getfilesystemencoding())
-        file_obj = io.BytesIO()
-        for target in [filename, filename_bytes, file_obj, None]:
-            SVGSurface(target, 123, 432).finish()
-        with open(filename, 'rb') as fd:
-            assert fd.read().startswith(b'<?xml')
-        with open(filename_bytes, 'rb') as fd:
-            assert fd.read().startswith(b'<?xml')
-        svg_bytes = file_obj.getvalue()
-        assert svg_bytes.startswith(b'<?xml')
-        assert b'viewBox="0 0 123 432"' in svg_bytes
 
     surface = SVGSurface(None, 1, 1)
     # Not obvious to test
     surface.restrict_to_version(cairocffi.SVG_VERSION_1_1)
 
 
+def test_svg_surface_target(output_target):
+    target, read_output = output_target
+    SVGSurface(target, 123, 432).finish()
+    if target is not None:
+        svg_bytes = read_output()
+        assert svg_bytes.startswith(b'<?xml')
+        assert b'viewBox="0 0 123 432"' in svg_bytes
+
+
 def test_ps_surface():
     assert set(PSSurface.get_levels()) >= set([
         cairocffi.PS_LEVEL_2, cairocffi.PS_LEVEL_3])
     assert PSSurface.ps_level_to_string(cairocffi.PS_LEVEL_3) == 'PS Level 3'
-    with pytest.raises(TypeError):
-        PSSurface.ps_level_to_string('PS_LEVEL_42')
-    with pytest.raises(ValueError):
-        PSSurface.ps_level_to_string(42)
-
-    with temp_directory() as tempdir:
-        filename = os.path.join(tempdir, 'foo.ps')
-        filename_bytes = filename.encode(sys.getfilesystemencoding())
-        file_obj = io.BytesIO()
-        for target in [filename, filename_bytes, file_obj, None]:
-            PSSurface(target, 123, 432).finish()
-        with open(filename, 'rb') as fd:
-            assert fd.read().startswith(b'%!PS')
-        with open(filename_bytes, 'rb') as fd:
-            assert fd.read().startswith(b'%!PS')
-        assert file_obj.getvalue().startswith(b'%!PS')
 
     file_obj = io.BytesIO()
     surface = PSSurface(file_obj, 1, 1)
@@ -520,26 +655,43 @@ def test_ps_surface():
     assert b'%%dolor' in ps_bytes
 
 
+def test_ps_surface_target(output_target):
+    target, read_output = output_target
+    PSSurface(target, 123, 432).finish()
+    if target is not None:
+        assert read_output().startswith(b'%!PS')
+
+
+@pytest.mark.parametrize('version_to_string', [
+    PDFSurface.version_to_string, SVGSurface.version_to_string,
+    PSSurface.ps_level_to_string])
+@pytest.mark.parametrize('version, exception', INVALID_VERSIONS)
+def test_invalid_version_to_string(version_to_string, version, exception):
+    with pytest.raises(exception):
+        version_to_string(version)
+
+
 @pytest.mark.xfail(cairo_version() < 11000,
                    reason='Cairo version too low')
 def _recording_surface_common(extents):
     surface = ImageSurface(cairocffi.FORMAT_ARGB32, 100, 100)
-    empty_pixels = surface.get_data()[:]
+    empty_pixels = surface.get_data().tobytes()
     assert empty_pixels == b'\x00' * 40000
 
     surface = ImageSurface(cairocffi.FORMAT_ARGB32, 100, 100)
     context = Context(surface)
-    context.move_to(20, 50)
-    context.show_text('Something about us.')
-    text_pixels = surface.get_data()[:]
+    # Shape the text once, with the default font shared by all contexts
+    glyphs = context.get_scaled_font().text_to_glyphs(
+        20, 50, 'Something about us.', with_clusters=False)
+    context.show_glyphs(glyphs)
+    text_pixels = surface.get_data().tobytes()
     assert text_pixels != empty_pixels
 
     recording_surface = RecordingSurface(cairocffi.CONTENT_COLOR_ALPHA,
                                          extents)
     context = Context(recording_surface)
-    context.move_to(20, 50)
     assert recording_surface.ink_extents() == (0, 0, 0, 0)
-    context.show_text('Something about us.')
+    context.show_glyphs(glyphs)
     recording_surface.flush()
     assert recording_surface.ink_extents() != (0, 0, 0, 0)
 
@@ -547,7 +699,7 @@ def _recording_surface_common(extents):
     context = Context(surface)
     context.set_source_surface(recording_surface)
     context.paint()
-    recorded_pixels = surface.get_data()[:]
+    recorded_pixels = surface.get_data().tobytes()
     return text_pixels, recorded_pixels
 
 
@@ -589,6 +741,9 @@ def test_matrix():
 
     assert m.transform_distance(1, 2) == (2, 6)
     assert m.transform_point(1, 2) == (14, 10)
+    assert m.as_array().tolist() == [[2, 0, 12], [0, 3, 4]]
+    assert m.transform_points([(1, 2), (0, 0)]).tolist() == [
+        [14, 10], [12, 4]]
 
     m2 = m.copy()
     assert m2 == m
@@ -633,12 +788,11 @@ def test_surface_pattern():
     assert pattern.get_matrix() != Matrix()
 
 
-def test_solid_pattern():
+def test_solid_pattern(throwaway_pdf):
     assert SolidPattern(1, .5, .25).get_rgba() == (1, .5, .25, 1)
     assert SolidPattern(1, .5, .25, .75).get_rgba() == (1, .5, .25, .75)
 
-    surface = PDFSurface(None, 1, 1)
-    context = Context(surface)
+    context = Context(throwaway_pdf)
     pattern = SolidPattern(1, .5, .25)
     context.set_source(pattern)
     assert isinstance(context.get_source(), SolidPattern)
@@ -679,14 +833,14 @@ def test_linear_gradient():
     # byte string that (hopefully) does not depend on rounding behavior:
     # 255 / 5. == 51.0 == 0x33
     surface = ImageSurface(cairocffi.FORMAT_A8, 8, 4)
-    assert surface.get_data()[:] == b'\x00' * 32
+    assert_surface_data(surface, b'\x00' * 32)
     gradient = LinearGradient(1.5, 0, 6.5, 0)
     gradient.add_color_stop_rgba(0, 0, 0, 0, 0)
     gradient.add_color_stop_rgba(1, 0, 0, 0, 1)
     context = Context(surface)
     context.set_source(gradient)
     context.paint()
-    assert surface.get_data()[:] == b'\x00\x00\x33\x66\x99\xCC\xFF\xFF' * 4
+    assert_surface_data(surface, b'\x00\x00\x33\x66\x99\xCC\xFF\xFF' * 4)
 
     assert b'/ShadingType 2' not in pdf_with_pattern()
     assert b'/ShadingType 2' in pdf_with_pattern(gradient)
@@ -736,7 +890,7 @@ def test_context_groups():
     assert context.get_group_target()._pointer == surface._pointer
     assert (context.get_group_target().get_content() ==
             cairocffi.CONTENT_COLOR_ALPHA)
-    assert surface.get_data()[:] == pixel(b'\x00\x00\x00\x00')
+    assert_surface_data(surface, PIXEL[b'\x00\x00\x00\x00'])
 
     with context:
         context.push_group_with_content(cairocffi.CONTENT_ALPHA)
@@ -748,9 +902,9 @@ def test_context_groups():
         context.pop_group_to_source()
         assert isinstance(context.get_source(), SurfacePattern)
         # Still nothing on the original surface
-        assert surface.get_data()[:] == pixel(b'\x00\x00\x00\x00')
+        assert_surface_data(surface, PIXEL[b'\x00\x00\x00\x00'])
         context.paint()
-        assert surface.get_data()[:] == pixel(b'\xCC\x00\x00\x00')
+        assert_surface_data(surface, PIXEL[b'\xCC\x00\x00\x00'])
 
     with context:
         context.push_group()
@@ -760,9 +914,9 @@ def test_context_groups():
         assert isinstance(context.get_source(), SolidPattern)
         assert isinstance(group, SurfacePattern)
         context.set_source_surface(group.get_surface())
-        assert surface.get_data()[:] == pixel(b'\xCC\x00\x00\x00')
+        assert_surface_data(surface, PIXEL[b'\xCC\x00\x00\x00'])
         context.paint()
-        assert surface.get_data()[:] == pixel(b'\xFF\xFF\x33\x66')
+        assert_surface_data(surface, PIXEL[b'\xFF\xFF\x33\x66'])
 
 
 def test_context_current_transform_matrix():
@@ -800,6 +954,11 @@ def test_context_path():
     assert context.copy_path() == []
     assert context.has_current_point() is False
     assert context.get_current_point() == (0, 0)
+    # Changes made directly through the cairo_t pointer are seen
+    cairocffi.cairo.cairo_move_to(context._pointer, 1, 2)
+    assert context.has_current_point() is True
+    assert context.get_current_point() == (1, 2)
+    context.new_path()
     context.arc(100, 200, 20, math.pi/2, 0)
     path_1 = context.copy_path()
     assert path_1[0] == (cairocffi.PATH_MOVE_TO, (100, 220))
@@ -807,6 +966,10 @@ def test_context_path():
     assert all(part[0] == cairocffi.PATH_CURVE_TO for part in path_1[1:])
     assert context.has_current_point() is True
     assert context.get_current_point() == (120, 200)
+    # The current point follows the transformation matrix
+    context.translate(20, 0)
+    assert context.get_current_point() == (100, 200)
+    context.translate(-20, 0)
 
     context.new_sub_path()
     assert context.copy_path() == path_1
@@ -821,7 +984,9 @@ def test_context_path():
     path_2 = context.copy_path()
     assert path_2[0] == (cairocffi.PATH_MOVE_TO, (100, 220))
     assert len(path_2) > 1
-    assert all(part[0] == cairocffi.PATH_CURVE_TO for part in path_2[1:])
+    types = numpy.frombuffer(context.copy_path_types(), dtype=numpy.uint8)
+    assert len(types) == len(path_2)
+    assert (types[1:] == cairocffi.PATH_CURVE_TO).all()
     assert path_2 != path_1
 
     context.new_path()
@@ -869,6 +1034,10 @@ def test_context_path():
     assert path[0] == (cairocffi.PATH_MOVE_TO, (10, 15))
     assert all(part[0] == cairocffi.PATH_LINE_TO for part in path[1:])
     assert path[-1] == (cairocffi.PATH_LINE_TO, (100, 120))
+    types = numpy.frombuffer(
+        context.copy_path_types(flat=True), dtype=numpy.uint8)
+    assert len(types) == len(path)
+    assert (types[1:] == cairocffi.PATH_LINE_TO).all()
 
     context.new_path()
     context.move_to(10, 20)
@@ -880,11 +1049,55 @@ def test_context_path():
     additional_path = [(cairocffi.PATH_LINE_TO, (30, 150))]
     context.append_path(additional_path)
     assert context.copy_path() == path + additional_path
+    path_data = context.copy_path_array()
+    assert isinstance(path_data, PathData)
+    assert numpy.array_equal(
+        numpy.frombuffer(path_data.types, dtype=numpy.uint8),
+        [cairocffi.PATH_MOVE_TO, cairocffi.PATH_LINE_TO,
+         cairocffi.PATH_LINE_TO])
+    assert numpy.array_equal(
+        numpy.frombuffer(path_data.points).reshape(-1, 2),
+        [[10, 20], [10, 30], [30, 150]])
+    context.new_path()
+    context.append_path(path_data)
+    assert context.copy_path() == path + additional_path
+    context.append_path(PathData(
+        numpy.array([cairocffi.PATH_CLOSE_PATH, cairocffi.PATH_LINE_TO]),
+        numpy.array([[40, 50]], dtype=numpy.float64)))
+    assert context.copy_path()[-1] == (cairocffi.PATH_LINE_TO, (40, 50))
     # Incorrect number of points:
     with pytest.raises(ValueError):
         context.append_path([(cairocffi.PATH_LINE_TO, (30, 150, 1))])
     with pytest.raises(ValueError):
         context.append_path([(cairocffi.PATH_LINE_TO, (30, 150, 1, 4))])
+    with pytest.raises(ValueError):
+        context.append_path(PathData(
+            bytes([cairocffi.PATH_LINE_TO]), array.array('d', [30])))
+
+
+@pytest.mark.parametrize('curve', [
+    ((10, 15), (20, 30), (70, 50), (100, 120)),
+    ((93.19, 0.0037), (97.07, 173.48), (35.60, 88.30), (111.44, 176.13)),
+    # Collinear, going past the end point
+    ((0, 0), (20, 0), (20, 0), (10, 0)),
+    # Nearly collinear, going back
+    ((58.7179, 99.6489), (-6.8402, 100), (36.4065, 100.2009), (-47.9339, 100)),
+    # Cusp
+    ((10, 10), (100, 50), (10, 50), (100, 10)),
+])
+@pytest.mark.parametrize('tolerance', [0.1, 0.25, 1])
+def test_flatten_cubic(curve, tolerance):
+    points = flatten_cubic(*curve, tolerance)
+    assert points[-1] == curve[3]
+    assert max_curve_distance(curve, [curve[0]] + points) <= tolerance
+
+
+def test_flatten_cubic_linear():
+    # Nearly straight curves are replaced by a single line
+    assert flatten_cubic(
+        (10, 15), (40, 15.05), (70, 14.95), (100, 15), 0.1) == [(100, 15)]
+    # Control points going past the end points are not straight
+    assert len(flatten_cubic((0, 0), (20, 0), (20, 0), (10, 0), 0.1)) > 1
 
 
 def test_context_properties():
@@ -899,6 +1112,9 @@ def test_context_properties():
     context.set_dash([4, 1, 3, 2], 1.5)
     assert context.get_dash() == ([4, 1, 3, 2], 1.5)
     assert context.get_dash_count() == 4
+    context.set_dash([1, 2] * 50)
+    assert context.get_dash() == ([1, 2] * 50, 0)
+    context.set_dash([4, 1, 3, 2], 1.5)
 
     assert context.get_fill_rule() == cairocffi.FILL_RULE_WINDING
     context.set_fill_rule(cairocffi.FILL_RULE_EVEN_ODD)
@@ -929,15 +1145,23 @@ def test_context_properties():
     assert context.get_tolerance() == 0.25
 
 
-def test_context_fill():
-    surface = ImageSurface(cairocffi.FORMAT_A8, 4, 4)
-    assert surface.get_data()[:] == b'\x00' * 16
+def test_context_fill(a8_surface):
+    surface = a8_surface
+    surface.clear()
+    assert_surface_data(surface, b'\x00' * 16)
     context = Context(surface)
     context.set_source_rgba(0, 0, 0, .5)
     context.set_line_width(.5)
     context.rectangle(1, 1, 2, 2)
     assert context.fill_extents() == (1, 1, 3, 3)
     assert context.stroke_extents() == (.75, .75, 3.25, 3.25)
+    # Extents follow changes made with the raw pointer
+    cairocffi.cairo.cairo_set_line_width(context._pointer, 1)
+    assert context.stroke_extents() == (.5, .5, 3.5, 3.5)
+    context.translate(1, 0)
+    assert context.fill_extents() == (0, 1, 2, 3)
+    context.translate(-1, 0)
+    context.set_line_width(.5)
     assert context.in_fill(2, 2) is True
     assert context.in_fill(.8, 2) is False
     assert context.in_stroke(2, 2) is False
@@ -946,26 +1170,27 @@ def test_context_fill():
     assert path
     context.fill_preserve()
     assert list(context.copy_path()) == path
-    assert surface.get_data()[:] == (
+    assert_surface_data(surface, (
         b'\x00\x00\x00\x00'
         b'\x00\x80\x80\x00'
         b'\x00\x80\x80\x00'
-        b'\x00\x00\x00\x00'
-    )
+        b'\x00\x00\x00\x00'))
     context.fill()
     assert list(context.copy_path()) == []
-    assert surface.get_data()[:] == (
+    assert_surface_data(surface, (
         b'\x00\x00\x00\x00'
         b'\x00\xC0\xC0\x00'
         b'\x00\xC0\xC0\x00'
-        b'\x00\x00\x00\x00'
-    )
+        b'\x00\x00\x00\x00'))
+    surface.clear()
+    assert_surface_data(surface, b'\x00' * 16)
 
 
-def test_context_stroke():
+def test_context_stroke(a8_surface):
+    surface = a8_surface
     for preserve in [True, False]:
-        surface = ImageSurface(cairocffi.FORMAT_A8, 4, 4)
-        assert surface.get_data()[:] == b'\x00' * 16
+        surface.clear()
+        assert_surface_data(surface, b'\x00' * 16)
         context = Context(surface)
         context.set_source_rgba(0, 0, 0, 1)
         context.set_line_width(1)
@@ -974,16 +1199,17 @@ def test_context_stroke():
         assert path
         context.stroke_preserve() if preserve else context.stroke()
         assert list(context.copy_path()) == (path if preserve else [])
-        assert surface.get_data()[:] == (
+        assert_surface_data(surface, (
             b'\xFF\xFF\xFF\x00'
             b'\xFF\x00\xFF\x00'
             b'\xFF\xFF\xFF\x00'
-            b'\x00\x00\x00\x00')
+            b'\x00\x00\x00\x00'))
 
 
-def test_context_clip():
-    surface = ImageSurface(cairocffi.FORMAT_A8, 4, 4)
-    assert surface.get_data()[:] == b'\x00' * 16
+def test_context_clip(a8_surface):
+    surface = a8_surface
+    surface.clear()
+    assert_surface_data(surface, b'\x00' * 16)
     context = Context(surface)
     context.rectangle(1, 1, 2, 2)
     assert context.clip_extents() == (0, 0, 4, 4)
@@ -1007,9 +1233,8 @@ def test_context_clip():
 
 @pytest.mark.xfail(cairo_version() < 11000,
                    reason='Cairo version too low')
-def test_context_in_clip():
-    surface = ImageSurface(cairocffi.FORMAT_A8, 4, 4)
-    context = Context(surface)
+def test_context_in_clip(a8_surface):
+    context = Context(a8_surface)
     context.rectangle(1, 1, 2, 2)
     assert context.in_clip(.5, 2) is True
     assert context.in_clip(1.5, 2) is True
@@ -1031,28 +1256,21 @@ def test_context_mask():
     surface = ImageSurface(cairocffi.FORMAT_ARGB32, 4, 4)
     context = Context(surface)
     context.mask(SurfacePattern(mask_surface))
-    o = pixel(b'\x00\x00\x00\x00')
-    b = pixel(b'\x80\x00\x00\x00')
-    B = pixel(b'\xFF\x00\x00\x00')
-    assert surface.get_data()[:] == (
-        B + o + o + o +
-        o + b + o + o +
-        o + o + o + o +
-        o + o + o + o
-    )
+    o, b, B = 0x00000000, 0x80000000, 0xFF000000
+    assert numpy.array_equal(as_array(surface), [
+        [B, o, o, o],
+        [o, b, o, o],
+        [o, o, o, o],
+        [o, o, o, o]])
 
     surface = ImageSurface(cairocffi.FORMAT_ARGB32, 4, 4)
     context = Context(surface)
     context.mask_surface(mask_surface, surface_x=1, surface_y=2)
-    o = pixel(b'\x00\x00\x00\x00')
-    b = pixel(b'\x80\x00\x00\x00')
-    B = pixel(b'\xFF\x00\x00\x00')
-    assert surface.get_data()[:] == (
-        o + o + o + o +
-        o + o + o + o +
-        o + B + o + o +
-        o + o + b + o
-    )
+    assert numpy.array_equal(as_array(surface), [
+        [o, o, o, o],
+        [o, o, o, o],
+        [o, B, o, o],
+        [o, o, b, o]])
 
 
 def test_context_font():
@@ -1098,10 +1316,10 @@ def test_context_font():
     assert list(context.copy_path()) == []
     context.text_path('a')
     assert list(context.copy_path())
-    assert surface.get_data()[:] == b'\x00' * 400
+    assert_surface_data(surface, b'\x00' * 400)
     context.move_to(1, 9)
     context.show_text('a')
-    assert surface.get_data()[:] != b'\x00' * 400
+    assert surface.get_data().tobytes() != b'\x00' * 400
 
     assert (context.get_font_options().get_hint_metrics() ==
             cairocffi.HINT_METRICS_DEFAULT)
@@ -1133,6 +1351,9 @@ def test_scaled_font():
     _, _, _, _, x_advance, y_advance = font.text_extents('i' * 10)
     assert x_advance > 0
     assert y_advance == 0
+    # Extents are cached by text
+    assert font.text_extents('i' * 10) is font.text_extents('i' * 10)
+    assert font.text_extents('i' * 20)[4] > x_advance
 
     font = ScaledFont(ToyFontFace('@cairo:serif'))
     _, _, _, _, x_advance, y_advance = font.text_extents('i' * 10)
@@ -1242,23 +1463,23 @@ def test_glyphs():
     assert text_path[:-1] == glyph_path[:-1]
 
     empty = b'\x00' * 100 * 20 * 4
-    assert surface.get_data()[:] == empty
+    assert_surface_data(surface, empty)
     context.show_glyphs(glyphs)
-    glyph_pixels = surface.get_data()[:]
+    glyph_pixels = surface.get_data().tobytes()
     assert glyph_pixels != empty
 
     surface = ImageSurface(cairocffi.FORMAT_ARGB32, 100, 20)
     context = Context(surface)
     context.move_to(5, 15)
     context.show_text_glyphs(text, glyphs, clusters, is_backwards)
-    text_glyphs_pixels = surface.get_data()[:]
+    text_glyphs_pixels = surface.get_data().tobytes()
     assert glyph_pixels == text_glyphs_pixels
 
     surface = ImageSurface(cairocffi.FORMAT_ARGB32, 100, 20)
     context = Context(surface)
     context.move_to(5, 15)
     context.show_text(text)
-    text_pixels = surface.get_data()[:]
+    text_pixels = surface.get_data().tobytes()
     assert glyph_pixels == text_pixels
 
 
@@ -1,3 +1,4 @@
+import os
 import sys
 
 from setuptools import setup
@@ -7,8 +8,13 @@ if sys.version_info.major < 3:
         'cairocffi does not support Python 2.x anymore. '
         'Please use Python 3 or install an older version of cairocffi.')
 
+cffi_modules = [
+    'cairocffi/ffi_build.py:ffi',
+    'cairocffi/ffi_build.py:ffi_pixbuf']
+if os.environ.get('CAIROCFFI_API_MODE') == '1':
+    # Compiled bindings, calling cairo without libffi
+    cffi_modules.append('cairocffi/ffi_build.py:ffi_api')
+
 setup(
-    cffi_modules=[
-        'cairocffi/ffi_build.py:ffi',
-        'cairocffi/ffi_build.py:ffi_pixbuf']
+    cffi_modules=cffi_modules
 )